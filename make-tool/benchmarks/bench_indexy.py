@@ -0,0 +1,389 @@
+"""
+Benchmarks for indexy.
+
+Generates large modules with subsection markers and functions in a temporary
+directory and measures indexy's extraction paths on them.
+
+    python benchmarks/bench_indexy.py single-pass --functions 20000
+    python benchmarks/bench_indexy.py grouping --functions 1000 5000
+    python benchmarks/bench_indexy.py scaling --files 5000
+    python benchmarks/bench_indexy.py cache --files 5000
+    python benchmarks/bench_indexy.py stream --files 5000
+    python benchmarks/bench_indexy.py serve --files 2000 --clients 4
+    python benchmarks/bench_indexy.py watch --files 2000
+    python benchmarks/bench_indexy.py mmap --megabytes 500 --scan-only
+"""
+import os
+import sys
+import time
+import json
+import random
+import socket
+import argparse
+import subprocess
+import threading
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotpy_toolkit.indexy import indexy  # noqa: E402
+
+
+def generate_module(path, functions, functions_per_section=10):
+    """Writes a module with ``functions`` functions and a '# Section' marker every few functions."""
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('"""Generated module."""\nimport os\n\n')
+        for number in range(functions):
+            if number % functions_per_section == 0:
+                file.write(f"# Section part {number // functions_per_section}\n\n")
+            prefix = "async def" if number % 5 == 0 else "def"
+            file.write(
+                f"{prefix} function_{number}(value, scale=2):\n"
+                f"    # Scale the value\n"
+                f"    result = [value * scale for _ in range({number % 50})]\n"
+                f"    return sum(result)\n\n\n"
+            )
+    return path
+
+
+def generate_tree(root, files, functions_per_file=30):
+    """Writes ``files`` generated modules spread over nested packages under ``root``."""
+    for number in range(files):
+        package = os.path.join(root, f"pkg{number % 25}", f"sub{number % 9}")
+        os.makedirs(package, exist_ok=True)
+        generate_module(os.path.join(package, f"module_{number}.py"), functions_per_file)
+    return root
+
+
+def best_of(repeat, function, *args):
+    """Runs ``function`` ``repeat`` times with stdout silenced and returns (best seconds, last result)."""
+    best, result = float("inf"), None
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function(*args)
+            best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def two_reads(path):
+    return indexy.extract_subsections(path), indexy.generate_function_index(path)
+
+
+def bench_single_pass(workdir, sizes, repeat):
+    """Compares the two-read extraction with ``index_file`` on modules of growing size."""
+    print(f"{'functions':>10} {'size MB':>8} {'two reads s':>12} {'single s':>10} {'speedup':>8}")
+    for functions in sizes:
+        path = generate_module(os.path.join(workdir, f"module_{functions}.py"), functions)
+        before, expected = best_of(repeat, two_reads, path)
+        after, result = best_of(repeat, indexy.index_file, path)
+        assert result == expected, "index_file must produce the same index"
+        size = os.path.getsize(path) / 1e6
+        print(f"{functions:>10} {size:>8.1f} {before:>12.3f} {after:>10.3f} {before / after:>7.2f}x")
+
+
+def legacy_grouping(functions, subsections):
+    """The original per-subsection scan over every function, kept for comparison."""
+    return [
+        {"subsection": subsection["name"], "functions": [
+            func for func in functions
+            if subsection["start_line"] <= func["start_line"] <= (subsection["end_line"] or float('inf'))
+        ]}
+        for subsection in subsections
+    ]
+
+
+def bench_grouping(workdir, sizes, repeat):
+    """Compares the legacy grouping with the bisect-based one on generated modules."""
+    print(f"{'functions':>10} {'sections':>9} {'legacy s':>10} {'bisect s':>10} {'speedup':>8}")
+    for functions in sizes:
+        path = generate_module(os.path.join(workdir, f"module_{functions}.py"), functions, functions_per_section=2)
+        subsections, found = indexy.index_file(path)
+        before, expected = best_of(repeat, legacy_grouping, found, subsections)
+        after, result = best_of(repeat, indexy.group_functions_by_subsection, found, subsections)
+        # Same membership per subsection; the new grouping also orders by line
+        assert [sorted(f["start_line"] for f in e["functions"]) for e in expected] == \
+               [[f["start_line"] for f in e["functions"]] for e in result if e["subsection"] != indexy.UNSECTIONED]
+        print(f"{len(found):>10} {len(subsections):>9} {before:>10.3f} {after:>10.4f} {before / after:>7.0f}x")
+
+
+def bench_scaling(workdir, files, jobs, repeat):
+    """Times ``index_project`` on a generated tree with a growing number of workers."""
+    root = generate_tree(os.path.join(workdir, "tree"), files)
+    jobs = jobs or sorted({1, 2, 4, 8, os.cpu_count() or 1})
+    print(f"{files} files, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'seconds':>9} {'files/s':>9} {'speedup':>8} {'efficiency':>11}")
+    baseline, expected = None, None
+    for workers in jobs:
+        seconds, project = best_of(repeat, indexy.index_project, root, workers)
+        expected = expected or project
+        assert project == expected, "the merged index must not depend on the worker count"
+        baseline = baseline or seconds
+        speedup = baseline / seconds
+        print(f"{workers:>8} {seconds:>9.2f} {files / seconds:>9.0f} {speedup:>7.2f}x {speedup / workers:>10.0%}")
+
+
+def bench_cache(workdir, files, repeat):
+    """Times a cold index against warm re-indexes of an unchanged and a slightly changed tree."""
+    root = generate_tree(os.path.join(workdir, "tree"), files)
+    cache_path = os.path.join(workdir, indexy.INDEX_CACHE_NAME)
+
+    def run():
+        cache = indexy.IndexCache(cache_path)
+        try:
+            return indexy.index_project(root, cache=cache)
+        finally:
+            cache.close()
+
+    cold, expected = best_of(1, run)
+    warm, project = best_of(repeat, run)
+    assert project == expected, "a warm index must match the cold one"
+    changed = sorted(indexy.discover_python_files(root))[::100]
+    for path in changed:
+        with open(path, "a", encoding="utf-8") as file:
+            file.write("\n\ndef appended():\n    return 1\n")
+    partial, _ = best_of(1, run)
+    print(f"{files} files")
+    print(f"{'cold':<22} {cold:>8.2f}s")
+    print(f"{'warm, unchanged':<22} {warm:>8.2f}s ({cold / warm:.0f}x faster)")
+    print(f"{f'warm, {len(changed)} changed':<22} {partial:>8.2f}s")
+
+
+def bench_stream(workdir, files):
+    """Compares exporting a fully built project index with streaming it to NDJSON while indexing."""
+    root = generate_tree(os.path.join(workdir, "tree"), files)
+    output = os.path.join(workdir, "_index.ndjson")
+
+    def buffered():
+        project = indexy.index_project(root, jobs=1)
+        first = time.perf_counter()
+        exporter = indexy.NDJSONExporter(output)
+        for file_entry in project:
+            exporter.write(file_entry)
+        exporter.close()
+        return first
+
+    def streamed():
+        first = None
+        exporter = indexy.NDJSONExporter(output)
+        for file_entry in indexy.iter_project_index(root, jobs=1):
+            exporter.write(file_entry)
+            first = first or time.perf_counter()
+        exporter.close()
+        return first
+
+    print(f"{files} files")
+    print(f"{'exporter':<10} {'seconds':>9} {'first write s':>14} {'peak MB':>9}")
+    for name, run in [("buffered", buffered), ("streamed", streamed)]:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            tracemalloc.start()
+            start = time.perf_counter()
+            first = run()
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+        print(f"{name:<10} {seconds:>9.2f} {first - start:>14.3f} {peak:>9.1f}")
+
+
+def query_mix(index, count, seed=0):
+    """Builds a repeatable mix of find/prefix/fuzzy/section requests against names in ``index``."""
+    rng = random.Random(seed)
+    names = index.names
+    sections = list(index.by_section)
+    requests = []
+    for number in range(count):
+        name = rng.choice(names)
+        op = ("find", "prefix", "prefix", "fuzzy", "section")[number % 5]
+        q = {"find": name, "prefix": name[:rng.randint(3, 11)], "section": rng.choice(sections),
+             "fuzzy": name.replace("_", "", 1)[:-1]}[op]
+        requests.append(json.dumps({"op": op, "q": q, "limit": 20}))
+    return requests
+
+
+def run_clients(address, requests, clients):
+    """Sends ``requests`` from ``clients`` connections in parallel; returns (seconds, per-request latencies)."""
+    latencies = []
+    lock = threading.Lock()
+
+    def client(lines):
+        mine = []
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(address)
+            reader = connection.makefile("rb")
+            for line in lines:
+                start = time.perf_counter()
+                connection.sendall(line.encode("utf-8") + b"\n")
+                reply = reader.readline()
+                mine.append(time.perf_counter() - start)
+                assert reply.startswith(b'{"results"'), reply
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(requests[number::clients],)) for number in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def bench_serve(workdir, files, queries, clients):
+    """Load-tests the symbol query server in-process and over a Unix socket."""
+    root = generate_tree(os.path.join(workdir, "tree"), files)
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        index = indexy.SymbolIndex(indexy.index_project(root))
+        load = time.perf_counter() - start
+    requests = query_mix(index, queries)
+    print(f"{index.stats()['symbols']} symbols in {files} files, index built in {load:.2f}s")
+
+    start = time.perf_counter()
+    for line in requests:
+        index.answer(line)
+    seconds = time.perf_counter() - start
+    print(f"{'in-process':<12} {queries / seconds:>10.0f} q/s {seconds / queries * 1e6:>8.1f} us/query")
+
+    address = os.path.join(workdir, "indexy.sock")
+    server = threading.Thread(target=indexy.serve_socket, args=(index, address), daemon=True)
+    server.start()
+    while not os.path.exists(address):
+        time.sleep(0.01)
+    seconds, latencies = run_clients(address, requests, clients)
+    p50, p99 = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+    print(f"{f'socket x{clients}':<12} {queries / seconds:>10.0f} q/s "
+          f"p50 {p50 * 1e6:.0f} us, p99 {p99 * 1e6:.0f} us")
+
+
+def bench_watch(workdir, files, repeat):
+    """Measures save-to-updated-export latency of watch mode against a full re-index of the tree."""
+    root = generate_tree(os.path.join(workdir, "tree"), files)
+    outputs = [(indexy.JSONExporter, os.path.join(workdir, "_index.json"))]
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        project = indexy.ProjectWatcher(root, outputs)
+    if indexy.InotifyWatcher.available():
+        watcher = indexy.InotifyWatcher(root, project.exclude)
+    else:
+        watcher = indexy.PollingWatcher(root, project.exclude)
+
+    full, _ = best_of(1, indexy.index_project, root)
+    targets = indexy.discover_python_files(root)[::max(1, files // repeat)][:repeat]
+    latencies = []
+    try:
+        for number, path in enumerate(targets):
+            with open(path, "a", encoding="utf-8") as file:
+                file.write(f"\n\ndef edited_{number}():\n    return {number}\n")
+            saved = time.perf_counter()
+            project.update(project.touched_keys(indexy.collect_batch(watcher)))
+            latencies.append(time.perf_counter() - saved)
+    finally:
+        watcher.close()
+    latencies.sort()
+    print(f"{files} files, {watcher.name}, debounce {indexy.WATCH_DEBOUNCE * 1000:.0f} ms")
+    print(f"{'full re-index':<22} {full * 1000:>9.0f} ms")
+    print(f"{'save to export, p50':<22} {latencies[len(latencies) // 2] * 1000:>9.0f} ms")
+    print(f"{'save to export, max':<22} {latencies[-1] * 1000:>9.0f} ms")
+
+
+MMAP_VARIANTS = {
+    "scan, readlines": "indexy.extract_subsections(path)",
+    "scan, mmap": "f = open(path, 'rb'); m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ); "
+                  "indexy.scan_subsections_mapped(m)",
+    "index, str": "indexy.index_source(open(path, encoding='utf-8').read().replace('\\r\\n', '\\n'), path)",
+    "index, mmap": "indexy.index_file_mapped(path)",
+}
+
+
+def measure_variant(statement, path):
+    """
+    Runs one statement in a fresh interpreter; returns (seconds, peak anonymous memory in MB).
+
+    Mapped file pages are clean page cache and would inflate a plain RSS figure,
+    so a sampler thread tracks RssAnon from /proc instead (falling back to
+    ru_maxrss where /proc is unavailable).
+    """
+    script = (
+        "import os, sys, time, mmap, resource, threading\n"
+        f"sys.path.insert(0, {os.path.dirname(os.path.dirname(os.path.abspath(__file__)))!r})\n"
+        "from dotpy_toolkit.indexy import indexy\n"
+        f"path = {path!r}\n"
+        "peak = [0] if os.path.exists('/proc/self/status') else None\n"
+        "def sample():\n"
+        "    while True:\n"
+        "        with open('/proc/self/status') as status:\n"
+        "            for line in status:\n"
+        "                if line.startswith('RssAnon:'):\n"
+        "                    peak[0] = max(peak[0], int(line.split()[1]))\n"
+        "        time.sleep(0.005)\n"
+        "if peak:\n"
+        "    threading.Thread(target=sample, daemon=True).start()\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "seconds = time.perf_counter() - start\n"
+        "time.sleep(0.02)\n"
+        "print(seconds, peak[0] if peak else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    )
+    seconds, peak_kb = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                                      check=True).stdout.split()[-2:]
+    return float(seconds), int(peak_kb) / 1024
+
+
+def bench_mmap(workdir, megabytes, scan_only):
+    """Compares peak RSS and time of the string and mmap paths on one very large generated module."""
+    path = os.path.join(workdir, "huge.py")
+    functions = 1000
+    generate_module(path, functions)
+    # Grow by concatenating a renumbered copy until the target size is reached
+    with open(path, "r", encoding="utf-8") as file:
+        block = file.read().split("\n", 3)[3]
+    with open(path, "a", encoding="utf-8") as file:
+        copy = 0
+        while file.tell() < megabytes * 1e6:
+            copy += 1
+            file.write(block.replace("function_", f"function_{copy}_"))
+    print(f"{os.path.getsize(path) / 1e6:.0f} MB module")
+    print(f"{'variant':<18} {'seconds':>9} {'peak MB':>9}")
+    for name, statement in MMAP_VARIANTS.items():
+        if scan_only and name.startswith("index"):
+            continue
+        seconds, peak = measure_variant(statement, path)
+        print(f"{name:<18} {seconds:>9.2f} {peak:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indexy on generated modules.")
+    parser.add_argument("mode", choices=["single-pass", "grouping", "scaling", "cache", "stream", "serve", "watch", "mmap"], help="What to benchmark.")
+    parser.add_argument("--functions", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="Functions per generated module (default: 1000 10000 50000).")
+    parser.add_argument("--files", type=int, default=2000, help="Modules in the generated tree for directory modes (default: 2000).")
+    parser.add_argument("--jobs", type=int, nargs="+", help="Worker counts for 'scaling' (default: 1 2 4 8 and the CPU count).")
+    parser.add_argument("--queries", type=int, default=50000, help="Requests sent by 'serve' (default: 50000).")
+    parser.add_argument("--clients", type=int, default=4, help="Parallel socket clients for 'serve' (default: 4).")
+    parser.add_argument("--megabytes", type=int, default=100, help="Size of the module for 'mmap' (default: 100).")
+    parser.add_argument("--scan-only", action="store_true", help="Skip the ast.parse variants in 'mmap'.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported (default: 3).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.mode == "single-pass":
+            bench_single_pass(workdir, args.functions, args.repeat)
+        elif args.mode == "grouping":
+            bench_grouping(workdir, args.functions, args.repeat)
+        elif args.mode == "scaling":
+            bench_scaling(workdir, args.files, args.jobs, args.repeat)
+        elif args.mode == "cache":
+            bench_cache(workdir, args.files, args.repeat)
+        elif args.mode == "stream":
+            bench_stream(workdir, args.files)
+        elif args.mode == "serve":
+            bench_serve(workdir, args.files, args.queries, args.clients)
+        elif args.mode == "watch":
+            bench_watch(workdir, args.files, args.repeat)
+        elif args.mode == "mmap":
+            bench_mmap(workdir, args.megabytes, args.scan_only)
+
+
+if __name__ == "__main__":
+    main()
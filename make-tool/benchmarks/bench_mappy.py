@@ -0,0 +1,376 @@
+"""
+Benchmarks for mappy.
+
+Builds a synthetic directory tree in a temporary directory and measures
+mappy's traversal on it.
+
+    python benchmarks/bench_mappy.py walk --entries 1000000
+    python benchmarks/bench_mappy.py latency --entries 20000 --latency-ms 5 --workers 1 4 16 32
+    python benchmarks/bench_mappy.py aggregate --entries 200000
+    python benchmarks/bench_mappy.py snapshot --entries 200000
+    python benchmarks/bench_mappy.py ignore --patterns 10000
+    python benchmarks/bench_mappy.py structured --entries 200000
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotpy_toolkit.mappy import mappy  # noqa: E402
+
+
+def generate_tree(root, entries, fanout=10, files_per_dir=40):
+    """Creates about ``entries`` empty files and directories under ``root``, ``fanout`` subdirectories per level."""
+    created, pending = 0, [root]
+    os.makedirs(root, exist_ok=True)
+    while pending and created < entries:
+        directory = pending.pop(0)
+        for number in range(files_per_dir):
+            open(os.path.join(directory, f"file_{number:03}.txt"), "w").close()
+        created += files_per_dir
+        for number in range(fanout):
+            child = os.path.join(directory, f"dir_{number:02}")
+            os.mkdir(child)
+            pending.append(child)
+        created += fanout
+    return created
+
+
+def legacy_create_dir_map(directory, exclude_dirs=None, indent="│   ", last_indent="└── ", warn_threshold=50):
+    """The original recursive ``os.listdir`` + ``os.path.isdir`` walker, kept for comparison."""
+    exclude_dirs = set(exclude_dirs or [])
+    dir_map = []
+
+    def recursive_map(current_dir, prefix=""):
+        try:
+            entries = [e for e in os.listdir(current_dir) if e not in exclude_dirs]
+            entries.sort()
+            if len(entries) > warn_threshold:
+                print(f"Warning: Directory '{current_dir}' contains {len(entries)} files.")
+            for i, entry in enumerate(entries):
+                path = os.path.join(current_dir, entry)
+                is_last = i == len(entries) - 1
+                connector = last_indent if is_last else "├── "
+                dir_map.append(f"{prefix}{connector}{entry}")
+                if os.path.isdir(path):
+                    next_prefix = prefix + (indent if not is_last else "    ")
+                    recursive_map(path, next_prefix)
+        except PermissionError:
+            dir_map.append(f"{prefix}{last_indent if prefix else ''}{current_dir} [Access Denied]")
+        except FileNotFoundError:
+            dir_map.append(f"{prefix}{last_indent if prefix else ''}{current_dir} [Not Found]")
+
+    recursive_map(directory)
+    return "\n".join(dir_map)
+
+
+class CallCounter:
+    """Counts calls to ``os`` functions that cost a syscall from Python while active."""
+
+    NAMES = ["stat", "lstat", "listdir", "scandir"]
+
+    def __init__(self):
+        self.counts = dict.fromkeys(self.NAMES, 0)
+        self.originals = {}
+
+    def __enter__(self):
+        for name in self.NAMES:
+            original = self.originals[name] = getattr(os, name)
+
+            def counted(*args, _name=name, _original=original, **kwargs):
+                self.counts[_name] += 1
+                return _original(*args, **kwargs)
+
+            setattr(os, name, counted)
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, original in self.originals.items():
+            setattr(os, name, original)
+
+
+def bench_walk(root, repeat):
+    """Compares the legacy walker with the scandir walker: wall-clock, stat/listing calls and output."""
+    print(f"{'walker':<10} {'seconds':>9} {'stat':>10} {'listdir':>9} {'scandir':>9}")
+    outputs = {}
+    for name, function in [("legacy", legacy_create_dir_map), ("scandir", mappy.create_dir_map)]:
+        best = float("inf")
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            for _ in range(repeat):
+                start = time.perf_counter()
+                outputs[name] = function(root)
+                best = min(best, time.perf_counter() - start)
+            with CallCounter() as counter:
+                function(root)
+        counts = counter.counts
+        print(f"{name:<10} {best:>9.2f} {counts['stat'] + counts['lstat']:>10,} "
+              f"{counts['listdir']:>9,} {counts['scandir']:>9,}")
+    assert outputs["legacy"] == outputs["scandir"], "the scandir walker must produce byte-identical output"
+    print(f"identical output ({len(outputs['scandir'].encode('utf-8')):,} bytes)")
+
+
+def slow_lister(latency, denied=()):
+    """Returns a lister that sleeps ``latency`` seconds per call, like a listdir round-trip over NFS/SSHFS."""
+    def lister(path, exclude_dirs=(), limit=None, sizes=False, mtimes=False, follow_symlinks=True):
+        time.sleep(latency)
+        if os.path.basename(path) in denied:
+            raise PermissionError(13, "Permission denied", path)
+        return mappy.list_directory(path, exclude_dirs, limit, sizes, mtimes, follow_symlinks)
+    return lister
+
+
+def bench_latency(root, latency_ms, workers):
+    """Times the walker on a lister with injected per-listing latency for a growing number of threads."""
+    # Some denied directories check that errors render the same with any worker count
+    lister = slow_lister(latency_ms / 1000, denied={"dir_07"})
+    print(f"{latency_ms} ms per listing")
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+    baseline, expected = None, None
+    for count in workers:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            start = time.perf_counter()
+            output = "\n".join(mappy.iter_dir_map(root, workers=count, lister=lister))
+            seconds = time.perf_counter() - start
+        expected = expected or output
+        assert output == expected, "the map must not depend on the worker count"
+        baseline = baseline or seconds
+        print(f"{count:>8} {seconds:>9.2f} {baseline / seconds:>7.1f}x")
+
+
+def du_walk(root):
+    """A separate 'du' pass: recursive bytes per directory from os.walk and lstat."""
+    totals = {}
+    for directory, dirs, files in os.walk(root, topdown=False):
+        totals[directory] = sum(os.lstat(os.path.join(directory, name)).st_size for name in files) + \
+            sum(totals[os.path.join(directory, name)] for name in dirs)
+    return totals
+
+
+def bench_aggregate(root, repeat):
+    """Compares a plain map followed by a separate du walk with the one-pass aggregate mode."""
+    def two_passes():
+        return mappy.create_dir_map(root), du_walk(root)
+
+    def one_pass():
+        tree, directories = mappy.scan_tree(root)
+        return "\n".join(mappy.iter_aggregate_map(tree)), mappy.heaviest_directories(directories)
+
+    print(f"{'mode':<24} {'seconds':>9}")
+    for name, function in [("map + separate du walk", two_passes), ("aggregate, one pass", one_pass)]:
+        best = float("inf")
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            for _ in range(repeat):
+                start = time.perf_counter()
+                function()
+                best = min(best, time.perf_counter() - start)
+        print(f"{name:<24} {best:>9.2f}")
+
+
+def bench_snapshot(root, workdir):
+    """Times a full snapshot against a diff of a mostly unchanged tree that reuses unchanged directories."""
+    # Age every directory past the racy window, as in a tree that was not modified just now
+    old = time.time() - 3600
+    for directory, _, _ in os.walk(root):
+        os.utime(directory, (old, old))
+
+    full_start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        previous, listed, _ = mappy.take_snapshot(root)
+    full = time.perf_counter() - full_start
+    path = os.path.join(workdir, "snapshot.json")
+    mappy.save_snapshot(previous, path)
+
+    changed_dirs = [directory for directory, _, _ in os.walk(root)][::97]
+    for number, directory in enumerate(changed_dirs):
+        open(os.path.join(directory, f"added_{number}.txt"), "w").close()
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        snapshot, relisted, reused = mappy.take_snapshot(root, previous=mappy.load_snapshot(path))
+        added, removed, changed = mappy.diff_snapshots(previous, snapshot)
+    incremental = time.perf_counter() - start
+    assert len(added) == len(changed_dirs) and not removed, "every added file must be reported"
+    print(f"{'full snapshot':<20} {full:>8.2f}s  {listed:>8,} directories listed")
+    print(f"{'diff, few changes':<20} {incremental:>8.2f}s  {relisted:>8,} directories listed, {reused:,} reused")
+
+
+def generate_ignore_patterns(count, seed=0):
+    """Builds a .gitignore-like mix of names, *.ext, prefix*, anchored paths, globs and negations."""
+    rng = random.Random(seed)
+    patterns = []
+    for number in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            patterns.append(f"name_{number}")
+        elif kind < 0.65:
+            patterns.append(f"*.ext{number}")
+        elif kind < 0.75:
+            patterns.append(f"prefix{number}*")
+        elif kind < 0.9:
+            patterns.append(f"/dir{number % 500}/sub{number}/")
+        elif kind < 0.97:
+            patterns.append(f"glob{number}?[ab]*.x")
+        else:
+            patterns.append(f"!name_{number - 1}")
+    return patterns
+
+
+class NaiveRules:
+    """One pattern at a time, last match wins: the baseline the compiled rules replace."""
+
+    def __init__(self, lines):
+        self.rules = []
+        for rule in map(mappy.parse_ignore_line, lines):
+            if rule is not None:
+                pattern, negated, dir_only, anchored = rule
+                self.rules.append((mappy.re.compile(mappy.translate_glob(pattern), mappy.re.DOTALL),
+                                   negated, dir_only, anchored))
+
+    def ignored(self, path, is_dir):
+        name = path.rpartition("/")[2]
+        for regex, negated, dir_only, anchored in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.fullmatch(path if anchored else name):
+                return not negated
+        return False
+
+
+# (.gitignore lines, [(path, is_dir, ignored)]) checked against both matchers before timing
+IGNORE_EDGE_CASES = [
+    # Ignore everything except directories and Python files
+    (["*", "!*/", "!*.py"], [("top.py", False, False), ("top.txt", False, True), ("src", True, False),
+                             ("src/dist/z.py", False, False), ("src/a.txt", False, True)]),
+    (["*.log", "!keep.log", "/dist", "build/"], [("a.log", False, True), ("keep.log", False, False),
+                                                 ("dist", True, True), ("src/dist", True, False),
+                                                 ("build", False, False), ("src/build", True, True)]),
+]
+
+
+def bench_ignore(pattern_count, entries, naive_entries):
+    """Measures matching cost per entry of the compiled rules against one-pattern-at-a-time matching."""
+    for lines, cases in IGNORE_EDGE_CASES:
+        rules, naive_rules = mappy.IgnoreRules(lines), NaiveRules(lines)
+        for path, is_dir, ignored in cases:
+            assert rules.ignored(path, is_dir) == naive_rules.ignored(path, is_dir) == ignored, (lines, path)
+
+    lines = generate_ignore_patterns(pattern_count)
+    rng = random.Random(1)
+    paths = []
+    for number in range(entries):
+        target = rng.randrange(pattern_count * 2)
+        kind = number % 6
+        name = [f"name_{target}", f"file.ext{target}", f"prefix{target}_file", f"glob{target}xa_1.x",
+                f"plain_{number}.txt", f"sub{target}"][kind]
+        paths.append((f"dir{target % 500}/{name}", kind == 5))
+
+    start = time.perf_counter()
+    rules = mappy.IgnoreRules(lines)
+    compile_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [rules.ignored(path, is_dir) for path, is_dir in paths]
+    compiled = (time.perf_counter() - start) / entries
+
+    naive_rules = NaiveRules(lines)
+    start = time.perf_counter()
+    expected = [naive_rules.ignored(path, is_dir) for path, is_dir in paths[:naive_entries]]
+    naive = (time.perf_counter() - start) / naive_entries
+    assert results[:naive_entries] == expected, "compiled rules must agree with one-at-a-time matching"
+
+    print(f"{pattern_count:,} patterns, compiled in {compile_seconds:.2f}s, {sum(results):,} of {entries:,} ignored")
+    print(f"{'one pattern at a time':<22} {naive * 1e6:>10.1f} us/entry")
+    print(f"{'compiled rules':<22} {compiled * 1e6:>10.1f} us/entry ({naive / compiled:.0f}x faster)")
+
+
+def bench_structured(root, workdir):
+    """Times each output format, then compares loading the nested JSON with lazily expanding the NDJSON map."""
+    paths = {}
+    print(f"{'format':<8} {'seconds':>9} {'size':>12}")
+    for name in ["text", "json", "ndjson"]:
+        path = paths[name] = os.path.join(workdir, f"map.{name}")
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull), open(path, "w", encoding="utf-8") as file:
+            if name == "text":
+                mappy.write_dir_map(mappy.iter_dir_map(root), file)
+            else:
+                events = mappy.walk_entries(root, sizes=True, mtimes=True)
+                if name == "json":
+                    mappy.write_json_map(events, file, "tree")
+                else:
+                    mappy.write_dir_map(mappy.iter_ndjson_map(events), file)
+        print(f"{name:<8} {time.perf_counter() - start:>9.2f} {os.path.getsize(path):>12,}")
+
+    # A consumer that wants the root listing and one subdirectory's listing
+    with open(paths["ndjson"], encoding="utf-8") as file:
+        target = max((json.loads(line) for line in file if '"type":"dir"' in line), key=lambda r: r["depth"])["path"]
+    parts = target.split("/")
+
+    def nested():
+        with open(paths["json"], encoding="utf-8") as file:
+            tree = json.load(file)
+        top = tree["children"]
+        node = tree
+        for part in parts:
+            node = next(child for child in node["children"] if child.get("name") == part)
+        return len(top), len(node["children"])
+
+    def lazy():
+        with mappy.LazyTree(paths["ndjson"]) as tree:
+            return len(tree.children()), len(tree.children(target))
+
+    print(f"{'loader':<24} {'seconds':>9} {'peak MB':>9}")
+    results = set()
+    for name, function in [("json.load nested tree", nested), ("LazyTree over NDJSON", lazy)]:
+        start = time.perf_counter()
+        results.add(function())
+        seconds = time.perf_counter() - start
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:<24} {seconds:>9.2f} {peak / 1e6:>9.1f}")
+    assert len(results) == 1, "both loaders must see the same listings"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mappy on a synthetic tree.")
+    parser.add_argument("mode", choices=["walk", "latency", "aggregate", "snapshot", "ignore", "structured"], help="What to benchmark.")
+    parser.add_argument("--entries", type=int, default=100000, help="Files and directories in the tree (default: 100000).")
+    parser.add_argument("--latency-ms", type=float, default=5, help="Injected delay per listing for 'latency' (default: 5).")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16, 32],
+                        help="Thread counts for 'latency' (default: 1 4 16 32).")
+    parser.add_argument("--patterns", type=int, default=10000, help="Ignore patterns for 'ignore' (default: 10000).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported (default: 3).")
+    args = parser.parse_args()
+
+    if args.mode == "ignore":
+        bench_ignore(args.patterns, args.entries, min(args.entries, 2000))
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        root = os.path.join(workdir, "tree")
+        start = time.perf_counter()
+        created = generate_tree(root, args.entries)
+        print(f"{created:,} entries generated in {time.perf_counter() - start:.1f}s")
+        if args.mode == "walk":
+            bench_walk(root, args.repeat)
+        elif args.mode == "latency":
+            bench_latency(root, args.latency_ms, args.workers)
+        elif args.mode == "aggregate":
+            bench_aggregate(root, args.repeat)
+        elif args.mode == "snapshot":
+            bench_snapshot(root, workdir)
+        elif args.mode == "structured":
+            bench_structured(root, workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmarks for pycat.
+
+Builds a synthetic tree of Python modules in a temporary directory and measures
+pycat's output paths on it.
+
+    python benchmarks/bench_pycat.py compress --files 2000
+    python benchmarks/bench_pycat.py strip --files 2000
+"""
+import os
+import ast
+import sys
+import time
+import random
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotpy_toolkit.pycat import pycat  # noqa: E402
+
+
+def generate_tree(root, files, functions_per_file=40, seed=0):
+    """Writes ``files`` modules of generated functions under ``root``, spread over nested packages."""
+    rng = random.Random(seed)
+    words = ["alpha", "beta", "gamma", "delta", "value", "result", "count", "index", "item", "total"]
+    paths = []
+    for number in range(files):
+        package = os.path.join(root, f"pkg{number % 20}", f"sub{number % 7}")
+        os.makedirs(package, exist_ok=True)
+        lines = ['"""Generated module."""', "import os", ""]
+        for function in range(functions_per_file):
+            a, b = rng.sample(words, 2)
+            lines += [
+                f"def {a}_{b}_{function}({a}, {b}=None):",
+                f"    # Combine {a} and {b}",
+                f"    {a}_{b} = [{a} * i for i in range({rng.randint(1, 100)})]",
+                f"    return sum({a}_{b}) + {rng.randint(0, 10 ** 6)}",
+                "",
+            ]
+        path = os.path.join(package, f"module_{number}.py")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines))
+        paths.append(path)
+    return paths
+
+
+def bench_compress(file_paths, workdir, repeat):
+    """Times plain and compressed output for every available codec."""
+    print(f"{'codec':<8} {'seconds':>9} {'MB/s':>9} {'size':>12} {'ratio':>7}")
+    raw_size = None
+    for codec in [None] + pycat.available_compressors():
+        output = os.path.join(workdir, "bench.txt")
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                pycat.write_files_to_text(file_paths, output, compress=codec)
+            best = min(best, time.perf_counter() - start)
+        written = pycat.compressed_name(output, codec)
+        size = os.path.getsize(written)
+        raw_size = raw_size or size
+        print(f"{codec or 'none':<8} {best:>9.3f} {raw_size / best / 1e6:>9.1f} {size:>12,} {raw_size / size:>7.2f}")
+        os.remove(written)
+
+
+# Sources whose blocks hold nothing but string statements; stripping must leave a 'pass' in each
+STRIP_EDGE_CASES = [
+    b'def f():\n    """a"""\n    """b"""\n',
+    b'class A:\n    "x"\n    def g(self):\n        "d"\n    "y"\n',
+    b'if x:\n    "a"  # comment\n    "b" "c"\nelse:\n    y = 1\n    "z"\n',
+]
+# Bare f-string statements run code when evaluated, so stripping must keep them
+STRIP_KEPT_CASES = [
+    b'def f():\n    f"{0:z+f}"\n',
+    b'def g():\n    "a" F"{x!r}"\n',
+]
+
+
+def bench_strip(file_paths):
+    """Times strip_source over the tree and checks that every stripped file still parses."""
+    total, stripped_total, seconds = 0, 0, 0.0
+    for path in file_paths:
+        with open(path, "rb") as file:
+            data = file.read()
+        start = time.perf_counter()
+        stripped, _ = pycat.strip_source(data)
+        seconds += time.perf_counter() - start
+        total += len(data)
+        stripped_total += len(stripped)
+        ast.parse(stripped)
+    for source in STRIP_EDGE_CASES:
+        ast.parse(pycat.strip_source(source)[0])
+    for source in STRIP_KEPT_CASES:
+        assert ast.dump(ast.parse(pycat.strip_source(source)[0])) == ast.dump(ast.parse(source)), source
+    print(f"{'seconds':>9} {'MB/s':>9} {'size':>12} {'stripped':>12}")
+    print(f"{seconds:>9.3f} {total / seconds / 1e6:>9.1f} {total:>12,} {stripped_total:>12,}")
+    print("every stripped file parses")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pycat on a synthetic tree.")
+    parser.add_argument("mode", choices=["compress", "strip"], help="What to benchmark.")
+    parser.add_argument("--files", type=int, default=1000, help="Number of generated modules (default: 1000).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported (default: 3).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        file_paths = generate_tree(os.path.join(workdir, "tree"), args.files)
+        if args.mode == "compress":
+            bench_compress(file_paths, workdir, args.repeat)
+        elif args.mode == "strip":
+            bench_strip(file_paths)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmarks for pyscope.
+
+Generates large Python modules and measures ``analyze_code_structure`` on them
+against the previous ast.walk implementation.
+
+    python benchmarks/bench_pyscope.py flat --functions 5000
+    python benchmarks/bench_pyscope.py nested --depth 60
+    python benchmarks/bench_pyscope.py literals --functions 200
+"""
+import os
+import sys
+import ast
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "make-dotpy"))
+
+import pyscope  # noqa: E402
+
+
+def legacy_analyze_code_structure(code):
+    """The previous implementation: ast.walk over the tree, then another walk per function."""
+    tree = ast.parse(code)
+    structure = {"functions": [], "classes": [], "imports": [], "miscellaneous": []}
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            structure["functions"].append({
+                "name": node.name,
+                "start_line": node.lineno,
+                "end_line": node.end_lineno if hasattr(node, 'end_lineno') else None,
+                "dependencies": legacy_extract_dependencies(node)
+            })
+        elif isinstance(node, ast.ClassDef):
+            structure["classes"].append({
+                "name": node.name,
+                "start_line": node.lineno,
+                "end_line": node.end_lineno if hasattr(node, 'end_lineno') else None,
+                "methods": [n.name for n in node.body if isinstance(n, ast.FunctionDef)]
+            })
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            structure["imports"].append({
+                "type": "import",
+                "name": ast.unparse(node).strip(),
+                "start_line": node.lineno
+            })
+        elif isinstance(node, ast.Expr) or isinstance(node, ast.Assign):
+            structure["miscellaneous"].append({
+                "type": "miscellaneous",
+                "code": ast.unparse(node).strip(),
+                "start_line": node.lineno
+            })
+
+    return structure
+
+
+def legacy_extract_dependencies(node):
+    dependencies = []
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call) and isinstance(child.func, ast.Name):
+            dependencies.append(child.func.id)
+    return dependencies
+
+
+def function_body(indent, number):
+    """Lines of an ordinary function body with a mix of plain and attribute calls."""
+    pad = " " * indent
+    return [
+        f"{pad}total = helper_{number % 17}(value) + len(items)",
+        f"{pad}for item in sorted(items, key=str):",
+        f"{pad}    if item.is_valid() and check(item):",
+        f"{pad}        total += compute(item.weight, factor={number})",
+        f"{pad}return total",
+    ]
+
+
+def generate_flat(functions):
+    """A module of top-level functions and classes with methods."""
+    lines = ["import os", "from collections import defaultdict", ""]
+    for number in range(functions):
+        if number % 4 == 0:
+            lines.append(f"class Model{number}(Base):")
+            lines.append(f"    def method_{number}(self, value, items):")
+            lines += function_body(8, number)
+        else:
+            lines.append(f"def function_{number}(value, items):")
+            lines += function_body(4, number)
+        lines.append("")
+    return "\n".join(lines)
+
+
+def generate_nested(depth, width=5):
+    """A module of ``width`` functions, each nesting ``depth`` closures inside one another."""
+    lines = []
+    for number in range(width):
+        for level in range(depth):
+            pad = " " * (4 * level)
+            lines.append(f"{pad}def level_{number}_{level}(value, items):")
+            lines += function_body(4 * level + 4, level)[:-1]
+        lines.append("")
+    return "\n".join(lines)
+
+
+def generate_literals(assignments, size=5000):
+    """A data-heavy module: large list and dict literals at module level, with a few functions in between."""
+    lines = ["import json", ""]
+    for number in range(assignments):
+        values = ", ".join(str(value * number) for value in range(size))
+        lines.append(f"TABLE_{number} = [{values}]")
+        lines.append(f"NAMES_{number} = {{" + ", ".join(f"'key{value}': {value}" for value in range(size // 10)) + "}")
+        lines.append(f"def lookup_{number}(index):")
+        lines += function_body(4, number)
+    return "\n".join(lines)
+
+
+def analyze(code):
+    """The current implementation, including the text that preprocess_code exports."""
+    return pyscope.materialize_segments(pyscope.analyze_code_structure(code), code)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pyscope on generated modules.")
+    parser.add_argument("mode", choices=["flat", "nested", "literals"], help="What kind of module to generate.")
+    parser.add_argument("--functions", type=int, default=2000, help="Functions in the 'flat' module, assignments in 'literals' (default: 2000).")
+    parser.add_argument("--depth", type=int, default=40, help="Nesting depth in the 'nested' module (default: 40).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported (default: 3).")
+    args = parser.parse_args()
+
+    if args.mode == "flat":
+        code = generate_flat(args.functions)
+    elif args.mode == "nested":
+        code = generate_nested(args.depth)
+    else:
+        code = generate_literals(args.functions)
+    print(f"{len(code.splitlines()):,} lines, {len(code):,} bytes")
+    print(f"{'implementation':<16} {'seconds':>9} {'functions':>10} {'calls':>9}")
+    for name, function in [("ast.walk", legacy_analyze_code_structure), ("visitor + spans", analyze)]:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            structure = function(code)
+            best = min(best, time.perf_counter() - start)
+        calls = sum(len(f["dependencies"]) for f in structure["functions"])
+        print(f"{name:<16} {best:>9.3f} {len(structure['functions']):>10,} {calls:>9,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,176 @@
 import ast
 import re
+import bisect
 import csv
 import json
 import argparse
+import contextlib
+import ctypes
+import ctypes.util
+import hashlib
+import heapq
+import mmap
 import os
+import select
+import signal
+import socketserver
+import sqlite3
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from stat import S_ISSOCK
+
+from dotpy_toolkit.mappy.mappy import IgnoreRules, WalkFilter
+
+
+DEFAULT_EXCLUDES = {".venv", "venv", "build", "dist", "node_modules", ".git", "__pycache__"}
+PARALLEL_MIN_FILES = 64  # Below this many files a process pool costs more than it saves
+INDEX_CACHE_NAME = ".indexy-cache.sqlite"
+INDEX_CACHE_VERSION = 1  # Bump whenever the extracted subsections/functions change shape or content
+UNSECTIONED = "(unsectioned)"
+WATCH_DEBOUNCE = 0.1  # Seconds without events before a batch of changes is re-indexed
+POLL_INTERVAL = 0.5  # Seconds between tree scans when inotify is unavailable
+SUBSECTION_PATTERN = re.compile(r"#\s*(Ch|Chapt|Chapter|Section|Subsection)[:\s]+(.+)")
+# Same markers on raw lines: whitespace classes must not cross '\n', and the name ends at the last non-blank
+SUBSECTION_BYTES_PATTERN = re.compile(
+    rb"^[ \t\r\f\v]*#[ \t\f\v]*(Ch|Chapt|Chapter|Section|Subsection)[: \t\f\v]+(.*?[^ \t\r\f\v])[ \t\r\f\v]*$",
+    re.MULTILINE,
+)
+MMAP_MIN_BYTES = 32 * 1024 * 1024  # Files at least this large are indexed through mmap
+NEWLINE_COUNT_WINDOW = 1 << 20
+
+
+def scan_subsections(lines):
+    """Finds subsection markers in an iterable of source lines (line numbers start at 1)."""
+    subsections = []
+
+    for lineno, line in enumerate(lines, start=1):
+        stripped = line.strip()
+        # Only comment lines can be markers; skip the regex for everything else
+        if not stripped.startswith("#"):
+            continue
+        match = SUBSECTION_PATTERN.match(stripped)
+        if match:
+            subsections.append({
+                "type": "subsection",
+                "name": match.group(2),
+                "start_line": lineno,
+                "end_line": None
+            })
+
+    # Assign end lines to each subsection
+    for i in range(len(subsections) - 1):
+        subsections[i]["end_line"] = subsections[i + 1]["start_line"] - 1
+
+    return subsections
+
+
+def scan_subsections_mapped(buffer):
+    """
+    Finds subsection markers in a bytes-like buffer such as an ``mmap``, without decoding it.
+
+    Marker lines are found with one compiled bytes regex over the whole buffer;
+    line numbers come from counting newlines between consecutive matches.
+    """
+    subsections = []
+    lineno, position = 1, 0
+
+    for match in SUBSECTION_BYTES_PATTERN.finditer(buffer):
+        start = match.start()
+        while position < start:
+            # Count in bounded windows so the slices never copy much of the buffer
+            end = min(start, position + NEWLINE_COUNT_WINDOW)
+            lineno += buffer[position:end].count(b"\n")
+            position = end
+        subsections.append({
+            "type": "subsection",
+            "name": match.group(2).decode("utf-8", errors="replace"),
+            "start_line": lineno,
+            "end_line": None
+        })
+
+    for i in range(len(subsections) - 1):
+        subsections[i]["end_line"] = subsections[i + 1]["start_line"] - 1
+
+    return subsections
+
+
+def index_mapped(buffer, file_path="<buffer>"):
+    """Extracts subsections and functions from a bytes-like buffer; ``ast.parse`` does the only decode."""
+    subsections = scan_subsections_mapped(buffer)
+
+    try:
+        tree = ast.parse(buffer, filename=file_path)
+    except (SyntaxError, ValueError) as e:
+        print(f"Error parsing file {file_path}: {e}")
+        return subsections, []
+
+    return subsections, collect_functions(tree)
+
+
+def index_file_mapped(file_path):
+    """Indexes a (large) Python file through a read-only memory map instead of reading it into a string."""
+    try:
+        with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return index_mapped(buffer, file_path)
+    except FileNotFoundError:
+        print(f"File not found: {file_path}")
+    except Exception as e:
+        print(f"Error processing file {file_path}: {e}")
+    return [], []
+
+
+def collect_functions(tree):
+    """Lists all functions (sync and async) in a parsed module."""
+    function_index = []
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) or isinstance(node, ast.AsyncFunctionDef):
+            function_index.append({
+                "type": "async def" if isinstance(node, ast.AsyncFunctionDef) else "def",
+                "name": node.name,
+                "start_line": node.lineno,
+                "end_line": getattr(node, 'end_lineno', None)
+            })
+
+    return function_index
+
+
+def index_file(file_path):
+    """
+    Extracts subsections and functions from a Python file with a single read.
+
+    The same buffer feeds the subsection scan and ``ast.parse``, so the result is
+    the same as ``extract_subsections`` plus ``generate_function_index`` at half
+    the I/O. Files of MMAP_MIN_BYTES or more go through ``index_file_mapped``.
+    """
+    try:
+        if os.path.getsize(file_path) >= MMAP_MIN_BYTES:
+            return index_file_mapped(file_path)
+        with open(file_path, "r", encoding="utf-8") as file:
+            code = file.read()
+    except FileNotFoundError:
+        print(f"File not found: {file_path}")
+        return [], []
+    except Exception as e:
+        print(f"Error processing file {file_path}: {e}")
+        return [], []
+
+    return index_source(code, file_path)
+
+
+def index_source(code, file_path="<string>"):
+    """Extracts subsections and functions from source text whose line endings are already '\\n'."""
+    subsections = scan_subsections(code.split("\n"))
+
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        print(f"Error parsing file {file_path}: {e}")
+        return subsections, []
+
+    return subsections, collect_functions(tree)
 
 
 def extract_subsections(file_path):
@@ -12,20 +179,7 @@ def extract_subsections(file_path):
 
     try:
         with open(file_path, "r", encoding="utf-8") as file:
-            for lineno, line in enumerate(file, start=1):
-                # Match subsections marked with various formats
-                match = re.match(r"#\s*(Ch|Chapt|Chapter|Section|Subsection)[:\s]+(.+)", line.strip())
-                if match:
-                    subsections.append({
-                        "type": "subsection",
-                        "name": match.group(2),
-                        "start_line": lineno,
-                        "end_line": None
-                    })
-
-        # Assign end lines to each subsection
-        for i in range(len(subsections) - 1):
-            subsections[i]["end_line"] = subsections[i + 1]["start_line"] - 1
+            subsections = scan_subsections(file)
 
     except FileNotFoundError:
         print(f"File not found: {file_path}")
@@ -49,14 +203,7 @@ def generate_function_index(file_path):
             print(f"Error parsing file {file_path}: {e}")
             return []
 
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef) or isinstance(node, ast.AsyncFunctionDef):
-                function_index.append({
-                    "type": "async def" if isinstance(node, ast.AsyncFunctionDef) else "def",
-                    "name": node.name,
-                    "start_line": node.lineno,
-                    "end_line": getattr(node, 'end_lineno', None)
-                })
+        function_index = collect_functions(tree)
 
     except FileNotFoundError:
         print(f"File not found: {file_path}")
@@ -67,23 +214,298 @@ def generate_function_index(file_path):
 
 
 def group_functions_by_subsection(functions, subsections):
-    """Groups functions under their respective subsections."""
-    grouped = []
-
-    for subsection in subsections:
-        # Find functions within the subsection's range
-        subsection_functions = [
-            func for func in functions
-            if subsection["start_line"] <= func["start_line"] <= (subsection["end_line"] or float('inf'))
-        ]
-        grouped.append({
-            "subsection": subsection["name"],
-            "functions": subsection_functions
-        })
+    """
+    Groups functions under their respective subsections.
+
+    Functions are sorted by start line and placed with ``bisect`` on the
+    subsection start lines, so grouping is O(n log n) instead of a scan of every
+    function for every subsection. Functions defined before the first marker go
+    into a leading UNSECTIONED bucket instead of being dropped.
+    """
+    subsections = sorted(subsections, key=lambda subsection: subsection["start_line"])
+    starts = [subsection["start_line"] for subsection in subsections]
+    grouped = [{"subsection": subsection["name"], "functions": []} for subsection in subsections]
+    unsectioned = []
+
+    for func in sorted(functions, key=lambda func: func["start_line"]):
+        position = bisect.bisect_right(starts, func["start_line"]) - 1
+        (grouped[position]["functions"] if position >= 0 else unsectioned).append(func)
+
+    if unsectioned:
+        grouped.insert(0, {"subsection": UNSECTIONED, "functions": unsectioned})
 
     return grouped
 
 
+def project_filter(exclude=None):
+    """
+    Returns the ``WalkFilter`` deciding what a project walk skips, using mappy's gitignore engine.
+
+    Args:
+        exclude: None for DEFAULT_EXCLUDES plus every .gitignore in the tree (nested
+            ones, anchored and directory-only patterns and '!' negations included),
+            a ``WalkFilter`` to use as is, or a list of gitignore-style patterns.
+    """
+    if exclude is None:
+        return WalkFilter(DEFAULT_EXCLUDES, gitignore=True)
+    if isinstance(exclude, WalkFilter):
+        return exclude
+    return WalkFilter((), rules=IgnoreRules(list(exclude)))
+
+
+def directory_filter(directory, walk_filter, relative):
+    """
+    Returns the filter for the entries of a directory inside a project, or None if it is ignored.
+
+    Args:
+        directory (str): Root directory of the project.
+        walk_filter (WalkFilter): The project's filter, from ``project_filter``.
+        relative (str): The directory relative to the root, '/'-separated ('' for the root).
+    """
+    current = walk_filter.enter(directory, "")
+    path = directory
+    for name in relative.split("/") if relative else ():
+        if current(name, True):
+            return None
+        path = os.path.join(path, name)
+        current = current.enter(path, current.child(name))
+    return current
+
+
+def is_ignored(directory, walk_filter, relative, is_dir):
+    """Tells whether a path relative to the project root is skipped by the project's filter."""
+    parent, _, name = relative.rpartition("/")
+    current = directory_filter(directory, walk_filter, parent)
+    return current is None or current(name, is_dir)
+
+
+def discover_python_files(directory, exclude=None, start=None):
+    """
+    Finds every Python file under a directory, in sorted (deterministic) order.
+
+    Entries skipped by ``project_filter(exclude)`` are left out, with .gitignore
+    files read as the walk reaches their directories, so ignored subtrees are
+    never listed.
+
+    Args:
+        directory (str): Root directory of the project; .gitignore rules are relative to it.
+        exclude: See ``project_filter``.
+        start (str): Only search this directory inside the project (default: the whole project).
+    """
+    walk_filter = project_filter(exclude)
+    start = directory if start is None else start
+    relative = os.path.relpath(start, directory).replace(os.sep, "/")
+    root_filter = directory_filter(directory, walk_filter, "" if relative == os.curdir else relative)
+    if root_filter is None:
+        return []
+
+    filters = {start: root_filter}
+    python_files = []
+    for root, dirs, files in os.walk(start):
+        current = filters.pop(root)
+        dirs[:] = sorted(d for d in dirs if not current(d, True))
+        for d in dirs:
+            filters[os.path.join(root, d)] = current.enter(os.path.join(root, d), current.child(d))
+        for file in sorted(files):
+            if file.endswith(".py") and not current(file, False):
+                python_files.append(os.path.join(root, file))
+    return python_files
+
+
+def index_file_with_digest(file_path):
+    """
+    Indexes one file and hashes its bytes from the same read (used as a pool job).
+
+    Files of MMAP_MIN_BYTES or more are indexed and hashed through a read-only
+    memory map, as in ``index_file_mapped``, instead of being read into memory.
+
+    Returns:
+        tuple: (subsections, functions, content digest or None if unreadable).
+    """
+    try:
+        if os.path.getsize(file_path) >= MMAP_MIN_BYTES:
+            with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                subsections, functions = index_mapped(buffer, file_path)
+                return subsections, functions, hashlib.blake2b(buffer, digest_size=16).hexdigest()
+        with open(file_path, "rb") as file:
+            data = file.read()
+        code = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    except FileNotFoundError:
+        print(f"File not found: {file_path}")
+        return [], [], None
+    except Exception as e:
+        print(f"Error processing file {file_path}: {e}")
+        return [], [], None
+
+    subsections, functions = index_source(code, file_path)
+    return subsections, functions, hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class IndexCache:
+    """
+    Persistent per-file index cache in a SQLite file.
+
+    Entries are keyed by path relative to the project and validated by size and
+    mtime, with the content hash as a fallback for files that were only touched.
+    Rows written by another INDEX_CACHE_VERSION are dropped on open.
+
+    Args:
+        path (str): SQLite file to use; created if missing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        try:
+            # Take the write lock up front, so a read-only cache fails here rather than halfway through a run
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+                "hash TEXT, subsections TEXT, functions TEXT)"
+            )
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != str(INDEX_CACHE_VERSION):
+                self.connection.execute("DELETE FROM files")
+                self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)",
+                                        (str(INDEX_CACHE_VERSION),))
+            self.connection.commit()
+        except sqlite3.Error:
+            self.connection.close()
+            raise
+        self.hits = 0
+
+    def is_current(self, key, file_path, stat):
+        """
+        Checks whether the cached entry for a file still matches it on disk.
+
+        Args:
+            key (str): Path relative to the project, as stored in the cache.
+            file_path (str): Path to read if the content hash has to be checked.
+            stat (os.stat_result): Current stat of the file.
+        """
+        row = self.connection.execute("SELECT size, mtime_ns, hash FROM files WHERE path = ?", (key,)).fetchone()
+        if row is None or row[0] != stat.st_size:
+            return False
+        size, mtime_ns, digest = row
+        if mtime_ns != stat.st_mtime_ns:
+            # Same size, new mtime: the file may only have been touched
+            try:
+                with open(file_path, "rb") as file:
+                    if hashlib.blake2b(file.read(), digest_size=16).hexdigest() != digest:
+                        return False
+            except OSError:
+                return False
+            self.connection.execute("UPDATE files SET mtime_ns = ? WHERE path = ?", (stat.st_mtime_ns, key))
+        self.hits += 1
+        return True
+
+    def load(self, key):
+        """Returns the cached (subsections, functions) for a file checked with ``is_current``."""
+        subsections, functions = self.connection.execute(
+            "SELECT subsections, functions FROM files WHERE path = ?", (key,)
+        ).fetchone()
+        return json.loads(subsections), json.loads(functions)
+
+    def lookup(self, key, file_path, stat):
+        """Returns the cached (subsections, functions) for a file, or None if it changed."""
+        return self.load(key) if self.is_current(key, file_path, stat) else None
+
+    def store(self, key, stat, digest, subsections, functions):
+        """Saves a freshly indexed file."""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+            (key, stat.st_size, stat.st_mtime_ns, digest, json.dumps(subsections), json.dumps(functions)),
+        )
+
+    def remove(self, keys):
+        """Drops the entries of deleted files."""
+        self.connection.executemany("DELETE FROM files WHERE path = ?", [(key,) for key in keys])
+
+    def prune(self, keep):
+        """Removes entries for files that are no longer part of the project."""
+        stale = [row for row in self.connection.execute("SELECT path FROM files").fetchall() if row[0] not in keep]
+        self.connection.executemany("DELETE FROM files WHERE path = ?", stale)
+        return len(stale)
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+
+def open_index_cache(path):
+    """Opens an ``IndexCache``, or warns and returns None so indexing goes on without one if it cannot be used."""
+    try:
+        return IndexCache(path)
+    except sqlite3.Error as e:
+        print(f"Warning: cannot use index cache {path} ({e}); indexing without it.")
+        return None
+
+
+def iter_project_index(directory, jobs=None, exclude=None, cache=None):
+    """
+    Indexes every Python file under a directory, yielding each file as soon as it is done.
+
+    Files are indexed in a ``ProcessPoolExecutor`` with chunked work distribution;
+    ``Executor.map`` hands results back in discovery order, so the merged index
+    is the same for any number of workers. With a cache only new or changed
+    files are parsed, and entries for deleted files are pruned at the end.
+
+    Args:
+        directory (str): Root directory of the project.
+        jobs (int): Number of worker processes (default: CPU count; 1 indexes in-process).
+        exclude: What to skip, as for ``project_filter`` (default: DEFAULT_EXCLUDES plus .gitignore rules).
+        cache (IndexCache): Persistent cache to read from and update (optional).
+
+    Yields:
+        dict: One {"file", "sections"} entry per file, paths relative to ``directory``.
+    """
+    file_paths = discover_python_files(directory, exclude)
+    keys = [os.path.relpath(file_path, directory) for file_path in file_paths]
+    stats = {}
+    cached = set()
+
+    if cache is not None:
+        for position, (key, file_path) in enumerate(zip(keys, file_paths)):
+            try:
+                stats[position] = os.stat(file_path)
+            except OSError:
+                continue
+            if cache.is_current(key, file_path, stats[position]):
+                cached.add(position)
+
+    misses = [position for position in range(len(file_paths)) if position not in cached]
+    miss_paths = [file_paths[position] for position in misses]
+    workers = jobs or os.cpu_count() or 1
+
+    with contextlib.ExitStack() as stack:
+        if workers == 1 or len(miss_paths) < PARALLEL_MIN_FILES:
+            fresh = map(index_file_with_digest, miss_paths)
+        else:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            # A few chunks per worker keeps IPC overhead low while still balancing uneven files
+            chunksize = max(1, len(miss_paths) // (workers * 4))
+            fresh = executor.map(index_file_with_digest, miss_paths, chunksize=chunksize)
+
+        for position, key in enumerate(keys):
+            if position in cached:
+                subsections, functions = cache.load(key)
+            else:
+                subsections, functions, digest = next(fresh)
+                if cache is not None and digest is not None and position in stats:
+                    cache.store(key, stats[position], digest, subsections, functions)
+            yield {"file": key, "sections": group_functions_by_subsection(functions, subsections)}
+
+    if cache is not None:
+        pruned = cache.prune(set(keys))
+        print(f"Index cache: {len(cached)} unchanged, {len(misses)} parsed, {pruned} pruned.")
+
+
+def index_project(directory, jobs=None, exclude=None, cache=None):
+    """Indexes every Python file under a directory; see ``iter_project_index``."""
+    return list(iter_project_index(directory, jobs, exclude, cache))
+
+
 def export_to_json(entries, output_path):
     """Exports the combined index to a JSON file."""
     try:
@@ -109,61 +531,695 @@ def export_to_csv(entries, output_path):
         print(f"Error exporting to CSV: {e}")
 
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Generate an index of functions and subsections in a Python file.")
-    parser.add_argument("file", help="Path to the input Python file.")
-    parser.add_argument("--json", action="store_true", help="Export the index to a JSON file.")
-    parser.add_argument("--csv", action="store_true", help="Export the index to a CSV file.")
+class JSONExporter:
+    """
+    Streams a project index into a JSON array, one file entry at a time.
 
-    args = parser.parse_args()
-    file_path = args.file
+    The result is the same as ``json.dump(project, file, indent=4)`` without
+    holding the project in memory.
+    """
 
-    if not os.path.exists(file_path):
-        print(f"Error: File {file_path} does not exist.")
-        exit(1)
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.file = open(output_path, "w", encoding="utf-8")
+        self.count = 0
 
-    # Extract subsections and functions
-    subsections = extract_subsections(file_path)
-    print(f"Extracted Subsections: {subsections}")
+    def write(self, file_entry):
+        body = json.dumps(file_entry, indent=4).replace("\n", "\n    ")
+        self.file.write(("[\n    " if self.count == 0 else ",\n    ") + body)
+        self.file.flush()
+        self.count += 1
 
-    functions = generate_function_index(file_path)
-    print(f"Extracted Functions: {functions}")
+    def close(self):
+        self.file.write("\n]" if self.count else "[]")
+        self.file.close()
+        print(f"Exported data to JSON file: {self.output_path}")
 
-    # Group functions by subsection
-    grouped_entries = group_functions_by_subsection(functions, subsections)
 
-    if grouped_entries:
-        print(f"\nIndex of functions grouped by subsections in {file_path}:\n")
-        for entry in grouped_entries:
-            print(f"Subsection: {entry['subsection']}")
+class NDJSONExporter:
+    """Streams a project index as newline-delimited JSON, one line per file."""
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.file = open(output_path, "w", encoding="utf-8")
+
+    def write(self, file_entry):
+        self.file.write(json.dumps(file_entry, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+        print(f"Exported data to NDJSON file: {self.output_path}")
+
+
+class CSVExporter:
+    """Streams a project index into a CSV file, one row per function with its file."""
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.file = open(output_path, "w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["File", "Subsection", "Type", "Name", "Start Line", "End Line"])
+
+    def write(self, file_entry):
+        for entry in file_entry["sections"]:
             for func in entry["functions"]:
-                print(f"  {func['type']} {func['name']} (Line {func['start_line']} - {func['end_line']})")
-            print()
+                self.writer.writerow([file_entry["file"], entry["subsection"], func["type"], func["name"],
+                                      func["start_line"], func["end_line"]])
+        self.file.flush()
 
-        # Prepare output file paths
-        base_name = os.path.splitext(file_path)[0]
-        json_output_path = f"{base_name}_index.json"
-        csv_output_path = f"{base_name}_index.csv"
+    def close(self):
+        self.file.close()
+        print(f"Exported data to CSV file: {self.output_path}")
 
-        # Export based on flags
-        if not args.json and not args.csv:
-            print("No output format specified. Exporting both JSON and CSV by default.")
-            args.json = True
-            args.csv = True
 
-        if args.json:
-            export_to_json(grouped_entries, json_output_path)
-        if args.csv:
-            export_to_csv(grouped_entries, csv_output_path)
+def export_outputs(directory, args):
+    """Returns (exporter class, path) pairs for the requested formats, defaulting to JSON and CSV."""
+    if not args.json and not args.csv and not args.ndjson:
+        print("No output format specified. Exporting both JSON and CSV by default.")
+        args.json = True
+        args.csv = True
+
+    outputs = [
+        (args.json, JSONExporter, "_index.json"),
+        (args.csv, CSVExporter, "_index.csv"),
+        (args.ndjson, NDJSONExporter, "_index.ndjson"),
+    ]
+    return [(exporter, os.path.join(directory, name)) for enabled, exporter, name in outputs if enabled]
+
+
+def index_directory_main(directory, args):
+    """Indexes a whole directory tree, streaming each file's entries to the exporters as it is done."""
+
+    exporters = []
+    files = functions = 0
+    cache = None
+    try:
+        if not args.no_cache:
+            cache = open_index_cache(args.cache or os.path.join(directory, INDEX_CACHE_NAME))
+        for exporter, output_path in export_outputs(directory, args):
+            exporters.append(exporter(output_path))
+
+        for file_entry in iter_project_index(directory, jobs=args.jobs, cache=cache):
+            for exporter in exporters:
+                exporter.write(file_entry)
+            files += 1
+            functions += sum(len(entry["functions"]) for entry in file_entry["sections"])
+    except Exception as e:
+        print(f"Error indexing {directory}: {e}")
+    finally:
+        for exporter in exporters:
+            exporter.close()
+        if cache is not None:
+            cache.close()
+
+    if files:
+        print(f"Indexed {functions} functions in {files} files under {directory}.")
     else:
-        print(f"No functions or subsections found in {file_path} or the file could not be processed.")
+        print(f"No Python files found in {directory}.")
+
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+INOTIFY_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """
+    Reports changed paths under a directory tree using Linux inotify through ctypes.
+
+    Every non-excluded directory gets a watch; directories created later are
+    watched as they appear. ``poll`` returns paths of changed files and of
+    directories that were created, moved or removed, or the root itself when
+    the kernel queue overflowed and the whole tree has to be rescanned.
+
+    A directory that cannot be watched (typically once ``max_user_watches`` is
+    used up) is reported once and its subtree is polled like ``PollingWatcher``
+    does instead, every ``interval`` seconds.
+    """
+
+    name = "inotify"
+
+    def __init__(self, directory, exclude=None, interval=POLL_INTERVAL):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.libc = libc
+        self.directory = directory
+        self.interval = interval
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        self.filters = {}  # watched directory -> WalkFilter for its entries
+        self.unwatched = {}  # subtree root -> (WalkFilter, (mtime, size) snapshot of its Python files), polled instead
+        self.add_tree(directory, project_filter(exclude).enter(directory, ""))
+
+    @staticmethod
+    def available():
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            return hasattr(ctypes.CDLL(ctypes.util.find_library("c") or None), "inotify_init1")
+        except OSError:
+            return False
+
+    def add_tree(self, directory, walk_filter):
+        """Watches a directory and its non-ignored subdirectories; ``walk_filter`` is the directory's own filter."""
+        filters = {directory: walk_filter}
+        for root, dirs, _ in os.walk(directory):
+            current = filters.pop(root)
+            dirs[:] = [d for d in dirs if not current(d, True)]
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(root), INOTIFY_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if not self.unwatched:
+                    print(f"Warning: cannot watch {root} ({os.strerror(error)}); "
+                          f"polling unwatched directories every {self.interval}s instead.")
+                dirs[:] = []  # The whole subtree is polled
+                self.unwatched[root] = (current, self.scan(root, current))
+                continue
+            self.watches[wd] = root
+            self.filters[root] = current
+            for d in dirs:
+                filters[os.path.join(root, d)] = current.enter(os.path.join(root, d), current.child(d))
+
+    @staticmethod
+    def scan(directory, walk_filter):
+        """Returns the (mtime, size) snapshot of the Python files under an unwatched directory."""
+        snapshot = {}
+        filters = {directory: walk_filter}
+        for root, dirs, files in os.walk(directory):
+            current = filters.pop(root)
+            dirs[:] = [d for d in dirs if not current(d, True)]
+            for d in dirs:
+                filters[os.path.join(root, d)] = current.enter(os.path.join(root, d), current.child(d))
+            for file in files:
+                if file.endswith(".py") and not current(file, False):
+                    file_path = os.path.join(root, file)
+                    try:
+                        stat = os.stat(file_path)
+                    except OSError:
+                        continue
+                    snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll_unwatched(self):
+        """Rescans the unwatched subtrees and returns the Python files that changed since the last scan."""
+        changed = set()
+        for root, (walk_filter, previous) in list(self.unwatched.items()):
+            snapshot = self.scan(root, walk_filter)
+            changed.update(path for path in snapshot.keys() | previous.keys()
+                           if snapshot.get(path) != previous.get(path))
+            self.unwatched[root] = (walk_filter, snapshot)
+        return changed
+
+    def poll(self, timeout=None):
+        """Waits up to ``timeout`` seconds (forever if None) and returns the set of changed paths."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = None if deadline is None else max(0, deadline - time.monotonic())
+            if self.unwatched:
+                wait = self.interval if wait is None else min(wait, self.interval)
+            changed = self.read_events(wait)
+            if self.unwatched:
+                changed |= self.poll_unwatched()
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def read_events(self, timeout):
+        """Waits up to ``timeout`` seconds (forever if None) for inotify events and returns the changed paths."""
+        changed = set()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return changed
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b"\0")
+            offset += INOTIFY_EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                changed.add(self.directory)
+                continue
+            root = self.watches.get(wd)
+            if root is None or not name:
+                continue
+            path = os.path.join(root, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                parent_filter = self.filters[root]
+                if parent_filter(os.fsdecode(name), True):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(path, parent_filter.enter(path, parent_filter.child(os.fsdecode(name))))
+                changed.add(path)
+            elif path.endswith(".py"):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """
+    Reports changed Python files by comparing (mtime, size) snapshots of the tree.
+
+    Used where inotify is unavailable. Each scan is one directory walk plus one
+    ``os.stat`` per Python file; no file is read unless it changed.
+    """
+
+    name = "polling"
+
+    def __init__(self, directory, exclude=None, interval=POLL_INTERVAL):
+        self.directory = directory
+        self.exclude = exclude
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self):
+        snapshot = {}
+        for file_path in discover_python_files(self.directory, self.exclude):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout=None):
+        """Rescans every ``interval`` seconds until something changed or ``timeout`` passed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval if deadline is None else max(0, min(self.interval, deadline - time.monotonic())))
+            snapshot = self.scan()
+            changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def collect_batch(watcher, debounce=WATCH_DEBOUNCE):
+    """
+    Blocks until something changes, then keeps collecting until the tree is quiet.
+
+    Events are merged until ``debounce`` seconds pass without a new one (or ten
+    times that in total), so an editor's write-rename-chmod burst or a branch
+    checkout becomes a single batch.
+    """
+    changed = watcher.poll(None)
+    deadline = time.monotonic() + debounce * 10
+    while time.monotonic() < deadline:
+        more = watcher.poll(debounce)
+        if not more:
+            break
+        changed |= more
+    return changed
+
+
+def walk_order(key):
+    """Sort key that reproduces ``discover_python_files`` order for relative paths."""
+    directory, name = os.path.split(key)
+    return (tuple(directory.split(os.sep)) if directory else (), name)
+
+
+class ProjectWatcher:
+    """
+    Keeps a directory's index and exports up to date as files change.
+
+    Holds one entry per file in memory; a batch of changes re-parses only the
+    touched files, updates the index cache, and rewrites the exports from memory
+    (each through a temporary file and ``os.replace``, so readers never see a
+    half-written index).
+    """
+
+    def __init__(self, directory, outputs, cache=None, jobs=None, exclude=None):
+        self.directory = directory
+        self.outputs = outputs
+        self.cache = cache
+        self.exclude = project_filter(exclude)
+        self.entries = {entry["file"]: entry for entry in iter_project_index(directory, jobs, self.exclude, cache)}
+        self.export()
+
+    def touched_keys(self, changed):
+        """Expands changed paths (files or whole directories) to relative keys of Python files."""
+        keys = set()
+        for path in changed:
+            key = os.path.relpath(path, self.directory)
+            if key != os.curdir and is_ignored(self.directory, self.exclude, key.replace(os.sep, "/"),
+                                               os.path.isdir(path)):
+                continue
+            if os.path.isdir(path) or key == os.curdir:
+                keys.update(os.path.relpath(file_path, self.directory)
+                            for file_path in discover_python_files(self.directory, self.exclude, path))
+            prefix = "" if key == os.curdir else key + os.sep
+            if key.endswith(".py"):
+                keys.add(key)
+            else:
+                keys.update(existing for existing in self.entries if existing.startswith(prefix))
+        return keys
+
+    def update(self, keys):
+        """Re-indexes the given files and rewrites the exports; returns (updated, removed) counts."""
+        updated = removed = 0
+        for key in keys:
+            file_path = os.path.join(self.directory, key)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                stat = None
+            if stat is None:
+                if self.entries.pop(key, None) is not None:
+                    removed += 1
+                    if self.cache is not None:
+                        self.cache.remove([key])
+                continue
+            subsections, functions, digest = index_file_with_digest(file_path)
+            if self.cache is not None and digest is not None:
+                self.cache.store(key, stat, digest, subsections, functions)
+            self.entries[key] = {"file": key, "sections": group_functions_by_subsection(functions, subsections)}
+            updated += 1
+        if self.cache is not None:
+            self.cache.connection.commit()
+        self.export()
+        return updated, removed
+
+    def export(self):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for exporter_class, output_path in self.outputs:
+                exporter = exporter_class(output_path + ".tmp")
+                try:
+                    for key in sorted(self.entries, key=walk_order):
+                        exporter.write(self.entries[key])
+                finally:
+                    exporter.close()
+                os.replace(output_path + ".tmp", output_path)
+
+
+def watch_main(directory, args):
+    """Indexes a directory, then re-indexes touched files on every change until interrupted."""
+    cache = None if args.no_cache else open_index_cache(args.cache or os.path.join(directory, INDEX_CACHE_NAME))
+    exclude = project_filter()
+    # Watch before the initial index, so edits made while it runs are picked up by the first batch
+    if InotifyWatcher.available():
+        watcher = InotifyWatcher(directory, exclude)
+    else:
+        watcher = PollingWatcher(directory, exclude)
+    try:
+        project = ProjectWatcher(directory, export_outputs(directory, args), cache, args.jobs, exclude)
+    except BaseException:
+        watcher.close()
+        raise
+    print(f"Watching {len(project.entries)} files under {directory} ({watcher.name}); press Ctrl-C to stop.")
+
+    try:
+        while True:
+            changed = collect_batch(watcher)
+            keys = project.touched_keys(changed)
+            if not keys:
+                continue
+            started = time.time()
+            saved = [os.stat(os.path.join(directory, key)).st_mtime
+                     for key in keys if os.path.exists(os.path.join(directory, key))]
+            updated, removed = project.update(keys)
+            finished = time.time()
+            latency = f"; save to index {(finished - max(saved)) * 1000:.0f} ms" if saved else ""
+            print(f"Re-indexed {updated} files, removed {removed} in {(finished - started) * 1000:.1f} ms{latency}")
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    finally:
+        watcher.close()
+        if cache is not None:
+            cache.close()
+
+
+def load_index_entries(path, jobs=None, cache_path=None, use_cache=True):
+    """
+    Loads {"file", "sections"} entries from a project, a Python file or an exported index.
+
+    Args:
+        path (str): A directory, a Python file, or an ``_index.json``/``_index.ndjson`` export.
+        jobs (int): Worker processes when a directory has to be indexed.
+        cache_path (str): Index cache to use for a directory (default: the one in the directory).
+        use_cache (bool): Whether to read and update the index cache at all.
+    """
+    if os.path.isdir(path):
+        cache = open_index_cache(cache_path or os.path.join(path, INDEX_CACHE_NAME)) if use_cache else None
+        try:
+            return list(iter_project_index(path, jobs=jobs, cache=cache))
+        finally:
+            if cache is not None:
+                cache.close()
+
+    if path.endswith(".ndjson"):
+        with open(path, "r", encoding="utf-8") as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as file:
+            entries = json.load(file)
+        if entries and "subsection" in entries[0]:
+            # A single-file export holds the sections of '<name>.py' directly
+            return [{"file": path[:-len("_index.json")] + ".py", "sections": entries}]
+        return entries
+
+    subsections, functions = index_file(path)
+    return [{"file": path, "sections": group_functions_by_subsection(functions, subsections)}]
+
+
+def trigrams(text):
+    """Returns the set of character trigrams of a lower-cased name, padded so short names still match."""
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymbolIndex:
+    """
+    Compact in-memory tables for answering symbol queries against a loaded index.
+
+    Names, files and subsections are interned so repeated strings are stored once.
+    Symbols live in one list of tuples; lookups go through a name dictionary, a
+    sorted array of lower-cased names searched with ``bisect`` for prefixes, and
+    a trigram index over distinct names for fuzzy matches.
+    """
+
+    def __init__(self, entries):
+        self.symbols = []
+        self.by_name = {}
+        self.by_section = {}
+        self.by_file = {}
+
+        for file_entry in entries:
+            file = sys.intern(file_entry["file"])
+            for entry in file_entry["sections"]:
+                subsection = sys.intern(entry["subsection"])
+                for func in entry["functions"]:
+                    name = sys.intern(func["name"])
+                    symbol_id = len(self.symbols)
+                    self.symbols.append((name, func["type"], file, subsection, func["start_line"], func["end_line"]))
+                    self.by_name.setdefault(name, []).append(symbol_id)
+                    self.by_section.setdefault(subsection, []).append(symbol_id)
+                    self.by_file.setdefault(file, []).append(symbol_id)
+
+        self.names = sorted(self.by_name, key=str.lower)
+        self.prefix_keys = [name.lower() for name in self.names]
+        self.trigram_index = {}
+        self.trigram_counts = []
+        for name_id, name in enumerate(self.names):
+            grams = trigrams(name)
+            self.trigram_counts.append(len(grams))
+            for gram in grams:
+                self.trigram_index.setdefault(gram, []).append(name_id)
+
+    def record(self, symbol_id):
+        name, kind, file, subsection, start_line, end_line = self.symbols[symbol_id]
+        return {"name": name, "type": kind, "file": file, "subsection": subsection,
+                "start_line": start_line, "end_line": end_line}
+
+    def _records(self, symbol_ids, limit):
+        return [self.record(symbol_id) for symbol_id in symbol_ids[:limit]]
+
+    def find(self, name, limit=50):
+        """Returns every definition of an exact name."""
+        return self._records(self.by_name.get(name, []), limit)
+
+    def prefix(self, prefix, limit=50):
+        """Returns definitions whose name starts with ``prefix`` (case-insensitive), in name order."""
+        prefix = prefix.lower()
+        results = []
+        position = bisect.bisect_left(self.prefix_keys, prefix)
+        while position < len(self.prefix_keys) and self.prefix_keys[position].startswith(prefix):
+            results.extend(self._records(self.by_name[self.names[position]], limit - len(results)))
+            if len(results) >= limit:
+                break
+            position += 1
+        return results
+
+    def fuzzy(self, text, limit=20):
+        """Returns definitions of the names sharing the most trigrams with ``text``, best first."""
+        query = trigrams(text)
+        shared = {}
+        for gram in query:
+            for name_id in self.trigram_index.get(gram, ()):
+                shared[name_id] = shared.get(name_id, 0) + 1
+        # Dice coefficient over trigram sets, so long names do not win on size alone
+        scored = heapq.nlargest(limit, shared.items(), key=lambda item: (
+            2 * item[1] / (len(query) + self.trigram_counts[item[0]]), -item[0]))
+        results = []
+        for name_id, _ in scored:
+            results.extend(self._records(self.by_name[self.names[name_id]], limit - len(results)))
+            if len(results) >= limit:
+                break
+        return results
+
+    def section(self, subsection, limit=500):
+        """Returns the definitions in a subsection, across all files."""
+        return self._records(self.by_section.get(subsection, []), limit)
+
+    def file(self, file, limit=500):
+        """Returns the definitions in one file, in line order."""
+        return self._records(self.by_file.get(file, []), limit)
+
+    def stats(self):
+        return {"symbols": len(self.symbols), "names": len(self.names), "files": len(self.by_file),
+                "subsections": len(self.by_section), "trigrams": len(self.trigram_index)}
+
+    def query(self, request):
+        """
+        Answers one protocol request.
+
+        Requests are objects such as ``{"op": "prefix", "q": "load_", "limit": 10}``,
+        with ``op`` one of find, prefix, fuzzy, section, file or stats. The reply is
+        ``{"results": [...]}`` or ``{"error": "..."}``; an ``id`` in the request is echoed back.
+        """
+        handlers = {"find": self.find, "prefix": self.prefix, "fuzzy": self.fuzzy,
+                    "section": self.section, "file": self.file}
+        op = request.get("op")
+        if op == "stats":
+            response = {"results": self.stats()}
+        elif op not in handlers:
+            response = {"error": f"unknown op {op!r}"}
+        elif not isinstance(request.get("q"), str):
+            response = {"error": "missing query string 'q'"}
+        else:
+            args = [request["q"]] + ([int(request["limit"])] if "limit" in request else [])
+            response = {"results": handlers[op](*args)}
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    def answer(self, line):
+        """Answers one JSON request line with one JSON response line."""
+        try:
+            request = json.loads(line)
+            response = self.query(request) if isinstance(request, dict) else {"error": "request must be an object"}
+        except (ValueError, TypeError) as e:
+            response = {"error": f"bad request: {e}"}
+        return json.dumps(response, separators=(",", ":")) + "\n"
+
+
+def serve_stream(index, infile, outfile):
+    """Answers newline-delimited JSON requests from ``infile`` until it is closed."""
+    for line in infile:
+        if line.strip():
+            outfile.write(index.answer(line))
+            outfile.flush()
+
+
+def serve_socket(index, socket_path=None, port=None):
+    """Answers newline-delimited JSON requests on a Unix socket, or on a localhost TCP port."""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if line.strip():
+                    self.wfile.write(index.answer(line).encode("utf-8"))
+
+    if port is not None:
+        server = socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler)
+        address = f"127.0.0.1:{server.server_address[1]}"
+    else:
+        try:
+            existing = os.lstat(socket_path)
+        except FileNotFoundError:
+            existing = None
+        if existing is not None:
+            # Only a stale socket from an earlier server is replaced, never another kind of file
+            if not S_ISSOCK(existing.st_mode):
+                print(f"Error: {socket_path} exists and is not a socket.", file=sys.stderr)
+                return
+            os.remove(socket_path)
+        server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+        address = socket_path
+    server.daemon_threads = True
+    print(f"Serving {index.stats()['symbols']} symbols on {address}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if port is None and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def serve_main(path, args):
+    """Loads or builds the index once, then answers queries until interrupted."""
+    # stdout may be the protocol channel, so progress messages go to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            entries = load_index_entries(path, jobs=args.jobs, cache_path=args.cache, use_cache=not args.no_cache)
+        except (OSError, ValueError, SyntaxError) as e:
+            print(f"Error loading index from {path}: {e}")
+            return
+        index = SymbolIndex(entries)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # Stop on SIGTERM the same way as on Ctrl-C, so the socket file is cleaned up
+    signal.signal(signal.SIGTERM, stop)
+    if args.socket or args.port is not None:
+        serve_socket(index, args.socket, args.port)
+    else:
+        print(f"Serving {index.stats()['symbols']} symbols on stdin/stdout", file=sys.stderr)
+        try:
+            serve_stream(index, sys.stdin, sys.stdout)
+        except KeyboardInterrupt:
+            pass
+
 
 def main():
-    import argparse
-    parser = argparse.ArgumentParser(description="Generate an index of functions and subsections in a Python file.")
-    parser.add_argument("file", help="Path to the input Python file.")
+    parser = argparse.ArgumentParser(description="Generate an index of functions and subsections in a Python file or project.")
+    parser.add_argument(
+        "file",
+        help="Path to the input Python file, or a directory to index every Python file under it "
+             "(skipping what its .gitignore files ignore, and common names like .venv and build)."
+    )
     parser.add_argument("--json", action="store_true", help="Export the index to a JSON file.")
     parser.add_argument("--csv", action="store_true", help="Export the index to a CSV file.")
+    parser.add_argument("--ndjson", action="store_true", help="Export a directory index as NDJSON, one line per file (directories only).")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker processes for directory indexing (default: CPU count).")
+    parser.add_argument("--cache", help=f"Index cache for directory indexing (default: '{INDEX_CACHE_NAME}' in the directory).")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every file and leave the index cache alone.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep a directory's exports up to date, re-indexing only the files that change.")
+    parser.add_argument("--serve", action="store_true",
+                        help="Load the index once and answer JSON-lines queries on stdin/stdout or a socket.")
+    parser.add_argument("--socket", help="Unix socket path for --serve.")
+    parser.add_argument("--port", type=int, help="Localhost TCP port for --serve (0 picks a free port).")
     args = parser.parse_args()
 
     file_path = args.file
@@ -172,9 +1228,25 @@ def main():
         print(f"Error: File {file_path} does not exist.")
         return
 
-    # Extract subsections and functions
-    subsections = extract_subsections(file_path)
-    functions = generate_function_index(file_path)
+    if args.serve:
+        serve_main(file_path, args)
+        return
+
+    if args.watch:
+        if not os.path.isdir(file_path):
+            parser.error("--watch needs a directory")
+        watch_main(file_path, args)
+        return
+
+    if os.path.isdir(file_path):
+        index_directory_main(file_path, args)
+        return
+
+    if args.ndjson:
+        parser.error("--ndjson needs a directory; use --json or --csv for a single file")
+
+    # Extract subsections and functions from a single read of the file
+    subsections, functions = index_file(file_path)
     grouped_entries = group_functions_by_subsection(functions, subsections)
 
     if grouped_entries:
@@ -202,3 +1274,7 @@ def main():
             export_to_csv(grouped_entries, csv_output_path)
     else:
         print(f"No functions or subsections found in {file_path} or the file could not be processed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
 import os
+import re
+import sys
+import json
+import time
+import heapq
 import argparse
+import contextlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 
 def read_gitignore(directory):
@@ -13,50 +20,1088 @@ def read_gitignore(directory):
     if not os.path.exists(gitignore_path):
         return []
 
-    with open(gitignore_path, "r") as file:
-        patterns = [line.strip() for line in file if line.strip() and not line.startswith("#")]
+    with open(gitignore_path, "r", encoding="utf-8", errors="replace") as file:
+        patterns = [line.rstrip("\n") for line in file if line.strip() and not line.startswith("#")]
     return patterns
 
 
-def create_dir_map(directory, exclude_dirs=None, indent="│   ", last_indent="└── ", warn_threshold=50):
+GLOB_CHARS = "*?[\\"
+
+
+def translate_glob(pattern):
+    """
+    Translates a gitignore glob into a regular expression (without anchors).
+
+    ``*`` and ``?`` never match '/', a leading ``**/`` or an inner ``/**/``
+    matches any number of directories, and a trailing ``/**`` everything inside.
+
+    :param pattern: The glob, with any leading '/' already removed.
+    :return: The regular expression source.
+    """
+    regex, i, n = [], 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == "*":
+            if pattern[i:i + 2] == "**" and (i == 0 or pattern[i - 1] == "/"):
+                if pattern[i + 2:i + 3] == "/":
+                    regex.append("(?:.*/)?")
+                    i += 3
+                    continue
+                if i + 2 == n:
+                    regex.append(".*")
+                    i += 2
+                    continue
+            while i + 1 < n and pattern[i + 1] == "*":
+                i += 1
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1:i + 2] in ("!", "^") else i + 1)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                regex.append(f"[{body}]")
+                i = end
+        elif char == "\\" and i + 1 < n:
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return "".join(regex)
+
+
+def parse_ignore_line(line):
+    """
+    Parses one .gitignore line.
+
+    :param line: The line, without its newline.
+    :return: (pattern, negated, dir_only, anchored), or None for blank lines and comments.
+    """
+    if line.endswith("\\ "):
+        line = line[:-2].rstrip() + "\\ "
+    else:
+        line = line.rstrip()
+    if not line or line.startswith("#"):
+        return None
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith(("\\#", "\\!")):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    # A slash anywhere but at the end anchors the pattern to the .gitignore's directory
+    anchored = "/" in line
+    line = line.lstrip("/")
+    if not line:
+        return None
+    return line, negated, dir_only, anchored
+
+
+class PatternSet:
+    """
+    Gitignore patterns matched all at once, reporting the rank of the last rule that matches.
+
+    Plain names and literal paths go into dictionaries, a bare ``*`` into one
+    rank that matches every name, and ``*suffix`` and ``prefix*`` names into dictionaries keyed by length. Other globs are indexed
+    by the literal text before their first wildcard, so an entry is only tried
+    against the few globs sharing its prefix; globs starting with a wildcard sit
+    behind one combined regex that rules most entries out in a single match.
+
+    :param patterns: (pattern, anchored, rank) tuples; a higher rank wins.
+    """
+
+    def __init__(self, patterns=()):
+        self.names, self.paths = {}, {}
+        self.any_name = -1  # Rank of the highest bare '*', which matches every name
+        suffixes, prefixes, name_globs, path_globs = {}, {}, [], []
+        for pattern, anchored, rank in patterns:
+            if anchored:
+                if any(char in pattern for char in GLOB_CHARS):
+                    path_globs.append((pattern, rank))
+                else:
+                    self._keep(self.paths, pattern, rank)
+                continue
+            body = pattern[1:] if pattern.startswith("*") else pattern[:-1] if pattern.endswith("*") else pattern
+            if any(char in body for char in GLOB_CHARS):
+                name_globs.append((pattern, rank))
+            elif not body:
+                self.any_name = max(self.any_name, rank)
+            elif body is pattern:
+                self._keep(self.names, pattern, rank)
+            elif pattern.startswith("*"):
+                self._keep(suffixes.setdefault(len(body), {}), body, rank)
+            else:
+                self._keep(prefixes.setdefault(len(body), {}), body, rank)
+
+        self.suffixes = sorted(suffixes.items())
+        self.prefixes = sorted(prefixes.items())
+        self.name_globs = self._index(name_globs)
+        self.path_globs = self._index(path_globs)
+
+    @staticmethod
+    def _keep(table, key, rank):
+        if table.get(key, -1) < rank:
+            table[key] = rank
+
+    @staticmethod
+    def _index(globs):
+        """Returns ([(length, {prefix: [(rank, regex)]})], combined regex, [(rank, regex)]) for the globs."""
+        by_prefix, unprefixed = {}, []
+        for pattern, rank in globs:
+            literal = re.match(r"[^*?\[\\]*", pattern).group()
+            compiled = (rank, re.compile(translate_glob(pattern), re.DOTALL))
+            if literal:
+                by_prefix.setdefault(len(literal), {}).setdefault(literal, []).append(compiled)
+            else:
+                unprefixed.append(compiled)
+        for table in by_prefix.values():
+            for bucket in table.values():
+                bucket.sort(key=lambda item: -item[0])
+        unprefixed.sort(key=lambda item: -item[0])
+        combined = re.compile("|".join(f"(?:{regex.pattern})" for _, regex in unprefixed), re.DOTALL) \
+            if unprefixed else None
+        return sorted(by_prefix.items()), combined, unprefixed
+
+    @staticmethod
+    def _glob_rank(text, globs):
+        index, combined, unprefixed = globs
+        best = -1
+        for length, table in index:
+            for rank, regex in table.get(text[:length], ()):
+                if rank <= best:
+                    break
+                if regex.fullmatch(text):
+                    best = rank
+                    break
+        if combined is not None and combined.fullmatch(text):
+            for rank, regex in unprefixed:
+                if rank <= best:
+                    break
+                if regex.fullmatch(text):
+                    best = rank
+                    break
+        return best
+
+    def rank(self, name, path):
+        """
+        Returns the highest rank of the patterns matching an entry.
+
+        :param name: The entry's name.
+        :param path: The entry's path relative to the .gitignore's directory, '/'-separated.
+        :return: The rank, or -1 if no pattern matches.
+        """
+        best = max(self.any_name, self.names.get(name, -1), self.paths.get(path, -1))
+        size = len(name)
+        for length, table in self.suffixes:
+            if length > size:
+                break
+            best = max(best, table.get(name[-length:], -1))
+        for length, table in self.prefixes:
+            if length > size:
+                break
+            best = max(best, table.get(name[:length], -1))
+        return max(best, self._glob_rank(name, self.name_globs), self._glob_rank(path, self.path_globs))
+
+
+class IgnoreRules:
+    """
+    The compiled rules of one .gitignore file, chained to the rules of the directories above it.
+
+    Consecutive rules of the same sign form a run, and a rule's rank is the
+    number of its run; since rules inside a run never override each other, the
+    highest-ranked match decides, and one lookup in a ``PatternSet`` finds it
+    instead of trying rules one by one. Deeper .gitignore files come before the
+    ones above them.
+
+    :param lines: The lines of the .gitignore file.
+    :param base: Directory of the .gitignore relative to the walk root, '/'-separated ('' for the root).
+    :param parent: The rules of the enclosing directories, or None.
+    """
+
+    def __init__(self, lines, base="", parent=None):
+        self.base = base
+        self.parent = parent
+        self.negated = []
+        any_entry, dirs_only = [], []
+        for pattern, negated, dir_only, anchored in filter(None, map(parse_ignore_line, lines)):
+            if not self.negated or self.negated[-1] != negated:
+                self.negated.append(negated)
+            (dirs_only if dir_only else any_entry).append((pattern, anchored, len(self.negated) - 1))
+        self.any_entry = PatternSet(any_entry)
+        self.dirs_only = PatternSet(dirs_only)
+
+    def match(self, path, is_dir):
+        """
+        Applies this file's rules to a path.
+
+        :param path: Path relative to the walk root, '/'-separated, inside ``base``.
+        :param is_dir: Whether the path is a directory.
+        :return: True if ignored, False if re-included by a negated rule, None if no rule matches.
+        """
+        local = path[len(self.base) + 1:] if self.base else path
+        name = local.rpartition("/")[2]
+        rank = self.any_entry.rank(name, local)
+        if is_dir:
+            rank = max(rank, self.dirs_only.rank(name, local))
+        return None if rank < 0 else not self.negated[rank]
+
+    def ignored(self, path, is_dir):
+        """
+        Tells whether a path is ignored by these rules or those of an enclosing .gitignore.
+
+        :param path: Path relative to the walk root, '/'-separated.
+        :param is_dir: Whether the path is a directory.
+        :return: True if the path is ignored.
+        """
+        rules = self
+        while rules is not None:
+            result = rules.match(path, is_dir)
+            if result is not None:
+                return result
+            rules = rules.parent
+        return False
+
+
+class WalkFilter:
+    """
+    Decides which entries of one directory a walk skips: exact names, plus gitignore rules if enabled.
+
+    A walk starts from one filter and calls ``enter`` for each directory it lists;
+    with ``gitignore`` set, that picks up the directory's own .gitignore, so
+    ignored subtrees are pruned before anything below them is listed.
+
+    :param names: Entry names to skip anywhere.
+    :param gitignore: Whether to read and apply .gitignore files, including nested ones; like git,
+                      this also always skips '.git' directories.
+    """
+
+    def __init__(self, names=(), gitignore=False, rules=None, relative=""):
+        self.names = names if isinstance(names, (set, frozenset)) else set(names)
+        self.gitignore = gitignore
+        self.rules = rules
+        self.relative = relative
+
+    def enter(self, path, relative):
+        """
+        Returns the filter for the entries of a directory.
+
+        :param path: The directory.
+        :param relative: The directory relative to the walk root, '/'-separated ('' for the root).
+        :return: A ``WalkFilter``.
+        """
+        rules = self.rules
+        if self.gitignore:
+            lines = read_gitignore(path)
+            if lines:
+                rules = IgnoreRules(lines, relative, rules)
+        return WalkFilter(self.names, self.gitignore, rules, relative)
+
+    def child(self, name):
+        """Returns the root-relative path of an entry of this filter's directory."""
+        return f"{self.relative}/{name}" if self.relative else name
+
+    def __call__(self, name, is_dir):
+        if name in self.names or (self.gitignore and is_dir and name == ".git"):
+            return True
+        return self.rules is not None and self.rules.ignored(self.child(name), is_dir)
+
+    def __repr__(self):
+        return f"{sorted(self.names)}{' + .gitignore rules' if self.gitignore else ''}"
+
+
+def as_walk_filter(exclude_dirs):
+    """
+    Accepts either a ``WalkFilter`` or a plain list of names to exclude.
+
+    :param exclude_dirs: A ``WalkFilter``, an iterable of names, or None.
+    :return: A ``WalkFilter``.
+    """
+    return exclude_dirs if isinstance(exclude_dirs, WalkFilter) else WalkFilter(exclude_dirs or ())
+
+
+def is_directory(entry, follow_symlinks=True):
+    """
+    Tells whether a directory entry should be descended into, like ``os.path.isdir``.
+
+    Uses the type cached from the directory listing; only symlinks cost an extra
+    ``stat``, to follow them as ``os.path.isdir`` does.
+
+    :param entry: An ``os.DirEntry`` from ``os.scandir``.
+    :param follow_symlinks: Whether a symlink to a directory counts as a directory.
+    :return: True if the entry is a directory, or a symlink to one when following symlinks.
+    """
+    try:
+        if entry.is_dir(follow_symlinks=False):
+            return True
+        return follow_symlinks and entry.is_symlink() and entry.is_dir()
+    except OSError:
+        return False
+
+
+def format_size(num_bytes):
+    """
+    Formats a byte count the way ``du -h`` does, e.g. '1.2 GB'.
+
+    :param num_bytes: The size in bytes.
+    :return: The size with a binary unit.
+    """
+    size = float(num_bytes)
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if size < 1024 or unit == "TB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def entry_size(entry, is_dir):
+    """
+    Returns the size of a file entry without following symlinks (0 for directories and unreadable entries).
+
+    :param entry: An ``os.DirEntry`` from ``os.scandir``.
+    :param is_dir: Whether the entry was found to be a directory.
+    :return: The size in bytes.
+    """
+    if is_dir:
+        return 0
+    try:
+        return entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        return 0
+
+
+def entry_mtime(entry):
+    """
+    Returns the modification time of an entry without following symlinks.
+
+    :param entry: An ``os.DirEntry`` from ``os.scandir``.
+    :return: The mtime in nanoseconds, or None if the entry cannot be stat'ed.
+    """
+    try:
+        return entry.stat(follow_symlinks=False).st_mtime_ns
+    except OSError:
+        return None
+
+
+def list_directory(path, skip=None, limit=None, sizes=False, mtimes=False, follow_symlinks=True):
+    """
+    Lists one directory for the walker.
+
+    This is the default lister; any callable with the same signature (for
+    example one that talks to a remote filesystem) can be passed to
+    ``iter_dir_map`` instead.
+
+    :param path: The directory to list.
+    :param skip: A callable taking (name, is_dir) that returns True for entries to leave out.
+    :param limit: Keep only the first ``limit`` names; the rest is only counted (None keeps all).
+    :param sizes: Add each entry's size in bytes as a fourth tuple item.
+    :param mtimes: Also add each entry's mtime in nanoseconds as a fifth tuple item (implies ``sizes``).
+    :param follow_symlinks: List symlinks to directories as directories; otherwise they are plain entries.
+    :return: (entries, rest): a list of (name, path, is_dir) tuples sorted by name, and
+             None or a (files, directories, file bytes) summary of the entries past ``limit``.
+    :raises OSError: If the directory cannot be listed.
+    """
+    with os.scandir(path) as scanner:
+        typed = ((e, is_directory(e, follow_symlinks)) for e in scanner)
+        if skip is not None:
+            typed = ((e, d) for e, d in typed if not skip(e.name, d))
+        if limit is None and not sizes and not mtimes:
+            return sorted((e.name, e.path, d) for e, d in typed), None
+        if limit is None and not mtimes:
+            return sorted((e.name, e.path, d, entry_size(e, d)) for e, d in typed), None
+        if limit is None:
+            return sorted((e.name, e.path, d, entry_size(e, d), entry_mtime(e)) for e, d in typed), None
+
+        totals = [0, 0, 0]
+
+        def tally(entry, is_dir):
+            size = entry_size(entry, is_dir)
+            totals[1 if is_dir else 0] += 1
+            totals[2] += size
+            if mtimes:
+                return entry.name, entry.path, is_dir, size, entry_mtime(entry)
+            return entry.name, entry.path, is_dir, size
+
+        # nsmallest keeps a heap of ``limit`` entries, so huge directories are never sorted or held
+        kept = heapq.nsmallest(limit, (tally(e, d) for e, d in typed))
+
+    for entry in kept:
+        totals[1 if entry[2] else 0] -= 1
+        totals[2] -= entry[3]
+    rest = tuple(totals) if totals[0] or totals[1] else None
+    return (kept if sizes or mtimes else [entry[:3] for entry in kept]), rest
+
+
+def collapsed_summary(rest):
+    """
+    Describes the entries left out of a capped directory, e.g. '… 98,231 more files (1.2 GB)'.
+
+    :param rest: A (files, directories, bytes) tuple, e.g. from ``list_directory``.
+    :return: The summary text.
+    """
+    files, dirs, size = rest
+    parts = []
+    if files:
+        parts.append(f"{files:,} more {'file' if files == 1 else 'files'}")
+    if dirs:
+        parts.append(f"{dirs:,} more {'directory' if dirs == 1 else 'directories'}")
+    summary = f"… {', '.join(parts)}"
+    return f"{summary} ({format_size(size)})" if files or size else summary
+
+
+def walk_entries(directory, exclude_dirs=None, warn_threshold=50, workers=1, lister=list_directory,
+                 max_depth=None, max_entries=None, sizes=False, mtimes=False):
+    """
+    Walks a tree with ``os.scandir`` and an explicit stack, yielding what it finds in map order.
+
+    Deep trees do not hit the recursion limit, and entry types come from the
+    listing instead of a ``stat`` per entry. With ``workers`` above 1, the
+    subdirectories of each listed directory are listed ahead of time on a
+    thread pool, so slow listings of siblings overlap; events still come out in
+    the same sorted, depth-first order. ``iter_dir_map`` renders these events as
+    text and ``iter_ndjson_map``/``write_json_map`` as JSON.
+
+    :param directory: The root directory to walk.
+    :param exclude_dirs: A list of names to exclude, or a ``WalkFilter``.
+    :param warn_threshold: Maximum number of files allowed in a directory before showing a warning.
+    :param workers: Number of threads listing directories concurrently (1 walks sequentially).
+    :param lister: The directory lister, called like ``list_directory``.
+    :param max_depth: Deepest level of entries to yield (None for no limit; 1 yields only the top level).
+    :param max_entries: Entries yielded per directory before the rest is collapsed into a summary.
+    :param sizes: List entries with their sizes, as ``list_directory`` does.
+    :param mtimes: List entries with their sizes and mtimes, as ``list_directory`` does.
+    :return: A generator of events, where ``depth`` is that of the listed directory (0 for the root):
+             ("entry", depth, relative path of the directory, is_last, entry tuple from the lister, descends),
+             ("rest", depth, relative path, (files, directories, bytes)) after the entries of a capped directory, or
+             ("error", depth, relative path, directory path, message) when a directory cannot be listed.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    prefetched = {}  # path -> Future of a listing started ahead of the consumer
+    flags = (True, True) if mtimes else (True,) if sizes else ()
+    # Pending work in output order: ("event", event) or ("dir", path, depth, relative path, parent filter)
+    stack = [("dir", directory, 0, "", as_walk_filter(exclude_dirs))]
+
+    def list_job(path, relative, parent_filter):
+        walk_filter = parent_filter.enter(path, relative)
+        entries, rest = lister(path, walk_filter, max_entries, *flags)
+        return entries, rest, walk_filter
+
+    def listing(path, relative, parent_filter):
+        future = prefetched.pop(path, None)
+        if future is not None:
+            return future.result()
+        return list_job(path, relative, parent_filter)
+
+    try:
+        while stack:
+            item = stack.pop()
+            if item[0] == "event":
+                yield item[1]
+                continue
+
+            _, current_dir, depth, relative, parent_filter = item
+            try:
+                entries, rest, walk_filter = listing(current_dir, relative, parent_filter)
+            except PermissionError:
+                yield "error", depth, relative, current_dir, "Access Denied"
+                continue
+            except FileNotFoundError:
+                yield "error", depth, relative, current_dir, "Not Found"
+                continue
+            except OSError as e:
+                yield "error", depth, relative, current_dir, f"Error: {e.strerror or e}"
+                continue
+
+            # Warn if directory has too many files
+            count = len(entries) + (rest[0] + rest[1] if rest else 0)
+            if count > warn_threshold:
+                print(f"Warning: Directory '{current_dir}' contains {count} files.")
+
+            descend = max_depth is None or depth + 1 < max_depth
+            if executor is not None and descend:
+                for entry in entries:
+                    if entry[2]:
+                        prefetched[entry[1]] = executor.submit(list_job, entry[1], walk_filter.child(entry[0]),
+                                                               walk_filter)
+
+            if rest:
+                stack.append(("event", ("rest", depth, relative, rest)))
+            for i in range(len(entries) - 1, -1, -1):
+                entry = entries[i]
+                if entry[2] and descend:
+                    stack.append(("dir", entry[1], depth + 1, walk_filter.child(entry[0]), walk_filter))
+                is_last = i == len(entries) - 1 and not rest
+                stack.append(("event", ("entry", depth, relative, is_last, entry, descend)))
+    finally:
+        if executor is not None:
+            for future in prefetched.values():
+                future.cancel()
+            executor.shutdown()
+
+
+def iter_dir_map(directory, exclude_dirs=None, indent="│   ", last_indent="└── ", warn_threshold=50,
+                 workers=1, lister=list_directory, max_depth=None, max_entries=None):
+    """
+    Yields the lines of a directory map as the tree is walked by ``walk_entries``.
+
+    Takes the same arguments as ``create_dir_map``, plus ``lister``, the callable
+    used to list each directory (``list_directory`` by default; one that talks to
+    a remote filesystem can be passed instead).
+    """
+    prefixes = [""]  # prefixes[depth] is the line prefix for the entries of the open directory at that depth
+    for event in walk_entries(directory, exclude_dirs, warn_threshold, workers, lister, max_depth, max_entries):
+        kind, depth = event[0], event[1]
+        prefix = prefixes[depth]
+        if kind == "entry":
+            _, _, _, is_last, entry, _ = event
+            yield f"{prefix}{last_indent if is_last else '├── '}{entry[0]}"
+            if entry[2]:
+                del prefixes[depth + 1:]
+                prefixes.append(prefix + ("    " if is_last else indent))
+        elif kind == "rest":
+            yield f"{prefix}{last_indent}{collapsed_summary(event[3])}"
+        else:
+            yield f"{prefix}{last_indent if prefix else ''}{event[3]} [{event[4]}]"
+
+
+class TreeNode:
+    """
+    One entry of an in-memory tree built by ``scan_tree``.
+
+    Directories carry recursive totals: ``files`` is the number of files below
+    them and ``size`` the bytes of those files. A file has ``files`` 1 and its
+    own size.
+    """
+
+    __slots__ = ("name", "path", "is_dir", "size", "files", "children", "error")
+
+    def __init__(self, name, path, is_dir, size=0):
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+        self.size = size
+        self.files = 0 if is_dir else 1
+        self.children = []
+        self.error = None
+
+
+def scan_tree(directory, exclude_dirs=None, workers=1, lister=list_directory):
+    """
+    Walks a directory once, collecting sizes, and totals file counts and bytes per directory bottom-up.
+
+    :param directory: The root directory to scan.
+    :param exclude_dirs: A list of names to exclude, or a ``WalkFilter``.
+    :param workers: Number of threads listing directories concurrently (1 walks sequentially).
+    :param lister: The directory lister, called like ``list_directory`` (with ``follow_symlinks=False``).
+    :return: (root node, list of directory nodes with every parent before its children).
+    """
+    root = TreeNode(directory, directory, True)
+    directories = [root]
+
+    def expand(node, relative, parent_filter):
+        walk_filter = parent_filter.enter(node.path, relative)
+        try:
+            # Like du, symlinks are leaves, so no subtree is counted twice
+            entries, _ = lister(node.path, walk_filter, None, True, follow_symlinks=False)
+        except PermissionError:
+            node.error = "Access Denied"
+            return []
+        except FileNotFoundError:
+            node.error = "Not Found"
+            return []
+        except OSError as e:
+            node.error = f"Error: {e.strerror or e}"
+            return []
+        node.children = [TreeNode(name, path, is_dir, size) for name, path, is_dir, size in entries]
+        return [(child, walk_filter.child(child.name), walk_filter) for child in node.children if child.is_dir]
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {executor.submit(expand, root, "", as_walk_filter(exclude_dirs))}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for task in future.result():
+                        directories.append(task[0])
+                        pending.add(executor.submit(expand, *task))
+    else:
+        stack = [(root, "", as_walk_filter(exclude_dirs))]
+        while stack:
+            children = expand(*stack.pop())
+            directories.extend(task[0] for task in children)
+            stack.extend(children)
+
+    # Children always come after their parent, so one reverse pass totals every subtree
+    for node in reversed(directories):
+        node.files = sum(child.files for child in node.children)
+        node.size = sum(child.size for child in node.children)
+    return root, directories
+
+
+def annotate(node):
+    """
+    Returns the du-style annotation for a tree line, e.g. '1,234 files, 56.7 MB'.
+
+    :param node: A ``TreeNode``.
+    :return: The annotation text.
+    """
+    if not node.is_dir:
+        return format_size(node.size)
+    return f"{node.files:,} {'file' if node.files == 1 else 'files'}, {format_size(node.size)}"
+
+
+def iter_aggregate_map(root, indent="│   ", last_indent="└── ", max_depth=None, max_entries=None):
+    """
+    Yields the lines of a directory map annotated with recursive file counts and sizes.
+
+    :param root: The root ``TreeNode`` from ``scan_tree``.
+    :param indent: The indentation for subdirectories.
+    :param last_indent: The indentation for the last element in a folder.
+    :param max_depth: Deepest level of entries to show (None for no limit).
+    :param max_entries: Entries shown per directory before the rest is collapsed into a summary line.
+    """
+    yield f"{root.path}  ({annotate(root)})"
+    stack = [(root, "", 0)]
+
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+            continue
+
+        node, prefix, depth = item
+        if node.error:
+            yield f"{prefix}{last_indent if prefix else ''}{node.path} [{node.error}]"
+            continue
+
+        shown = node.children if max_entries is None else node.children[:max_entries]
+        rest = node.children[len(shown):]
+        descend = max_depth is None or depth + 1 < max_depth
+        if rest:
+            summary = (sum(1 for child in rest if not child.is_dir), sum(1 for child in rest if child.is_dir),
+                       sum(child.size for child in rest))
+            stack.append(f"{prefix}{last_indent}{collapsed_summary(summary)}")
+        for i in range(len(shown) - 1, -1, -1):
+            child = shown[i]
+            is_last = i == len(shown) - 1 and not rest
+            if child.is_dir and descend:
+                stack.append((child, prefix + (indent if not is_last else "    "), depth + 1))
+            connector = last_indent if is_last else "├── "
+            stack.append(f"{prefix}{connector}{child.name}  ({annotate(child)})")
+
+
+def heaviest_directories(directories, count=10):
+    """
+    Picks the largest subtrees by bytes with a heap instead of sorting every directory.
+
+    :param directories: Directory nodes from ``scan_tree`` (the root, first, is skipped).
+    :param count: How many to return.
+    :return: The ``count`` heaviest directory nodes, largest first.
+    """
+    return heapq.nlargest(count, directories[1:], key=lambda node: node.size)
+
+
+def create_dir_map(directory, exclude_dirs=None, indent="│   ", last_indent="└── ", warn_threshold=50, workers=1,
+                   max_depth=None, max_entries=None):
     """
     Creates a directory map starting from the given directory.
     Optional exclusion of subdirectories.
 
     :param directory: The root directory to map.
-    :param exclude_dirs: A list of subdirectory names to exclude.
+    :param exclude_dirs: A list of subdirectory names to exclude, or a ``WalkFilter``.
     :param indent: The indentation for subdirectories.
     :param last_indent: The indentation for the last element in a folder.
     :param warn_threshold: Maximum number of files allowed in a directory before showing a warning.
+    :param workers: Number of threads listing directories concurrently (1 walks sequentially).
+    :param max_depth: Deepest level of entries to show (None for no limit; 1 shows only the top level).
+    :param max_entries: Entries shown per directory before the rest is collapsed into a summary line.
     :return: A string representation of the directory map.
     """
-    exclude_dirs = set(exclude_dirs or [])
-    dir_map = []
+    return "\n".join(iter_dir_map(directory, exclude_dirs, indent, last_indent, warn_threshold, workers,
+                                  max_depth=max_depth, max_entries=max_entries))
+
+
+def write_dir_map(lines, file):
+    """
+    Writes map lines to a file as they are produced, with the same layout as ``create_dir_map``.
+
+    :param lines: An iterable of lines, e.g. from ``iter_dir_map``.
+    :param file: A text file object to write to.
+    :return: The number of lines written.
+    """
+    count = 0
+    for line in lines:
+        file.write(f"\n{line}" if count else line)
+        count += 1
+    return count
+
+
+def compact_json(value):
+    """Encodes a value as JSON without optional whitespace."""
+    return json.dumps(value, separators=(",", ":"))
+
+
+def node_record(entry, **fields):
+    """
+    Builds the JSON record of one listed entry.
+
+    :param entry: An entry tuple from the lister, optionally with size and mtime.
+    :param fields: Leading fields of the record, e.g. its path and depth.
+    :return: A dict of ``fields`` and the type, plus the size for files and the mtime when listed.
+    """
+    record = dict(fields)
+    record["type"] = "dir" if entry[2] else "file"
+    if len(entry) > 3 and not entry[2]:
+        record["size"] = entry[3]
+    if len(entry) > 4 and entry[4] is not None:
+        record["mtime"] = entry[4]
+    return record
+
+
+def iter_ndjson_map(events):
+    """
+    Yields a directory map as NDJSON lines, one record per node in depth-first order.
+
+    The first record is the root, {"path": ".", "depth": 0, "type": "dir"}. Every
+    other record carries the path relative to the root, its depth, its type
+    ("dir" or "file"), and for files the size and (if listed) the mtime in
+    nanoseconds. A directory's subtree is the run of records after it with a
+    greater depth, which is what ``LazyTree`` relies on. A directory that could
+    not be listed gets a child {"type": "error", "error": ...} and a capped one a
+    child {"type": "more", "files": ..., "dirs": ..., "size": ...}, both with the
+    directory's own path.
+
+    :param events: Events from ``walk_entries``.
+    :return: A generator of JSON lines without trailing newlines.
+    """
+    yield compact_json({"path": ".", "depth": 0, "type": "dir"})
+    for event in events:
+        kind, depth, relative = event[0], event[1], event[2]
+        if kind == "entry":
+            name = event[4][0]
+            yield compact_json(node_record(event[4], path=f"{relative}/{name}" if relative else name, depth=depth + 1))
+        elif kind == "rest":
+            files, dirs, size = event[3]
+            yield compact_json({"path": relative or ".", "depth": depth + 1, "type": "more",
+                                "files": files, "dirs": dirs, "size": size})
+        else:
+            yield compact_json({"path": relative or ".", "depth": depth + 1, "type": "error", "error": event[4]})
+
+
+def write_json_map(events, file, root_name):
+    """
+    Writes a directory map as one compact nested JSON tree while it is walked.
+
+    Nodes are {"name", "type", ...} objects with the same fields as the NDJSON
+    records, minus path and depth; directories that were descended into have a
+    "children" list, which holds the error or "more" summary objects too.
+
+    :param events: Events from ``walk_entries``.
+    :param file: A text file object to write to.
+    :param root_name: The name of the root node.
+    :return: The number of nodes written, not counting the root.
+    """
+    file.write(compact_json({"name": root_name, "type": "dir"})[:-1] + ',"children":[')
+    first = [True]  # first[level]: nothing written yet in the innermost open children list at that level
+    count = 0
+    for event in events:
+        kind, depth = event[0], event[1]
+        # The walk is depth-first, so a shallower event means the open directories below it are done
+        while len(first) > depth + 1:
+            file.write("]}")
+            first.pop()
+        if not first[-1]:
+            file.write(",")
+        first[-1] = False
+        if kind == "entry":
+            entry = event[4]
+            node = node_record(entry, name=entry[0])
+            if entry[2] and event[5]:
+                file.write(compact_json(node)[:-1] + ',"children":[')
+                first.append(True)
+            else:
+                file.write(compact_json(node))
+            count += 1
+        elif kind == "rest":
+            files, dirs, size = event[3]
+            file.write(compact_json({"type": "more", "files": files, "dirs": dirs, "size": size}))
+        else:
+            file.write(compact_json({"type": "error", "error": event[4]}))
+    file.write("]}" * len(first))
+    return count
+
+
+RECORD_HEAD = re.compile(rb',"depth":(\d+),"type":"(\w+)"')
+
+
+class LazyTree:
+    """
+    Reads an NDJSON map from ``iter_ndjson_map`` on demand.
+
+    Opening the file makes one pass over it to index where each directory's
+    record and subtree start and end; only that index (one entry per directory)
+    is kept in memory. ``children`` then seeks to a directory's subtree and
+    reads its direct children, seeking past the subtrees of subdirectories, so
+    expanding a node costs the size of its own listing, not of everything below it.
+
+    :param path: The NDJSON file.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.spans = {}  # directory path -> (offset of its record, offset of its first child, offset past its subtree)
+        self._index()
+
+    def _index(self):
+        open_dirs = []  # (depth, path, record offset, children offset) of directories whose subtree is still open
+        offset = 0
+        for line in self.file:
+            # Records are written as {"path":...,"depth":N,"type":...}; a quote inside the path is escaped,
+            # so the first ',"depth":' is the field itself and only directory records need decoding
+            match = RECORD_HEAD.search(line)
+            depth = int(match.group(1))
+            while open_dirs and open_dirs[-1][0] >= depth:
+                _, path, start, children = open_dirs.pop()
+                self.spans[path] = (start, children, offset)
+            if match.group(2) == b"dir":
+                open_dirs.append((depth, json.loads(line)["path"], offset, offset + len(line)))
+            offset += len(line)
+        for _, path, start, children in open_dirs:
+            self.spans[path] = (start, children, offset)
+
+    def node(self, path="."):
+        """
+        Returns the record of a directory.
+
+        :param path: The directory relative to the root ('.' for the root).
+        :return: The record dict.
+        :raises KeyError: If the map has no such directory.
+        """
+        self.file.seek(self.spans[path][0])
+        return json.loads(self.file.readline())
+
+    def children(self, path="."):
+        """
+        Returns the direct children of a directory, in map order.
+
+        :param path: The directory relative to the root ('.' for the root).
+        :return: A list of record dicts, including any "error" or "more" records of the directory.
+        :raises KeyError: If the map has no such directory.
+        """
+        _, offset, end = self.spans[path]
+        self.file.seek(offset)
+        children = []
+        while offset < end:
+            line = self.file.readline()
+            offset += len(line)
+            record = json.loads(line)
+            children.append(record)
+            if record["type"] == "dir":
+                skip = self.spans[record["path"]][2]
+                if skip != offset:
+                    self.file.seek(skip)
+                    offset = skip
+        return children
+
+    def walk(self, path=".", max_depth=None):
+        """
+        Yields the records below a directory in depth-first order, expanding one directory at a time.
+
+        :param path: The directory to start from ('.' for the root).
+        :param max_depth: Levels below ``path`` to expand (None for all).
+        :return: A generator of record dicts.
+        """
+        base = self.node(path)["depth"]
+        stack = [iter(self.children(path))]
+        while stack:
+            record = next(stack[-1], None)
+            if record is None:
+                stack.pop()
+                continue
+            yield record
+            if record["type"] == "dir" and (max_depth is None or record["depth"] - base < max_depth):
+                stack.append(iter(self.children(record["path"])))
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+SNAPSHOT_VERSION = 1
+RACY_WINDOW_NS = 2 * 10 ** 9  # Directories modified this close to a snapshot are re-listed next time
+
+
+def take_snapshot(directory, exclude_dirs=None, previous=None):
+    """
+    Records every directory of a tree with its mtime, inode and entries.
 
-    def recursive_map(current_dir, prefix=""):
+    With a ``previous`` snapshot, a directory whose mtime and inode are unchanged
+    reuses the recorded entries instead of being listed again; only its own
+    ``stat`` is needed to find out. Entry changes always bump the directory
+    mtime, but content changes of files inside an unchanged directory do not,
+    so those are only seen in directories that were re-listed. Symlinks are
+    recorded as entries and not followed.
+
+    :param directory: The root directory to snapshot.
+    :param exclude_dirs: A list of names to exclude, or a ``WalkFilter``.
+    :param previous: An earlier snapshot of the same tree, from ``load_snapshot``.
+    :return: (snapshot, number of directories listed, number of directories reused).
+    """
+    old_dirs = previous["dirs"] if previous else {}
+    old_taken = previous["taken_ns"] if previous else 0
+    taken_ns = time.time_ns()
+    dirs = {}
+    listed = reused = 0
+    stack = [(os.curdir, as_walk_filter(exclude_dirs))]
+
+    while stack:
+        relative, parent_filter = stack.pop()
+        path = directory if relative == os.curdir else os.path.join(directory, relative)
+        walk_filter = parent_filter.enter(path, "" if relative == os.curdir else relative.replace(os.sep, "/"))
         try:
-            entries = [e for e in os.listdir(current_dir) if e not in exclude_dirs]
-            entries.sort()
+            stat = os.stat(path)
+            old = old_dirs.get(relative)
+            if (old and old["mtime_ns"] == stat.st_mtime_ns and old["ino"] == stat.st_ino
+                    and old_taken - stat.st_mtime_ns > RACY_WINDOW_NS):
+                entries = old["entries"]
+                reused += 1
+            else:
+                entries = {}
+                with os.scandir(path) as scanner:
+                    for entry in scanner:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        if walk_filter(entry.name, is_dir):
+                            continue
+                        if is_dir:
+                            entries[entry.name] = [1, 0, 0]
+                        else:
+                            info = entry.stat(follow_symlinks=False)
+                            entries[entry.name] = [0, info.st_size, info.st_mtime_ns]
+                listed += 1
+        except OSError as e:
+            # Unreadable directories are left out, so a diff reports their old entries as removed
+            print(f"Warning: cannot read '{path}': {e.strerror or e}")
+            continue
 
-            # Warn if directory has too many files
-            if len(entries) > warn_threshold:
-                print(f"Warning: Directory '{current_dir}' contains {len(entries)} files.")
-
-            for i, entry in enumerate(entries):
-                path = os.path.join(current_dir, entry)
-                is_last = i == len(entries) - 1
-                connector = last_indent if is_last else "├── "
-                dir_map.append(f"{prefix}{connector}{entry}")
-                if os.path.isdir(path):
-                    next_prefix = prefix + (indent if not is_last else "    ")
-                    recursive_map(path, next_prefix)
-        except PermissionError:
-            dir_map.append(f"{prefix}{last_indent if prefix else ''}{current_dir} [Access Denied]")
-        except FileNotFoundError:
-            dir_map.append(f"{prefix}{last_indent if prefix else ''}{current_dir} [Not Found]")
+        dirs[relative] = {"mtime_ns": stat.st_mtime_ns, "ino": stat.st_ino, "entries": entries}
+        for name in sorted(entries, reverse=True):
+            if entries[name][0]:
+                stack.append((name if relative == os.curdir else os.path.join(relative, name), walk_filter))
+
+    snapshot = {"version": SNAPSHOT_VERSION, "root": os.path.abspath(directory), "taken_ns": taken_ns, "dirs": dirs}
+    return snapshot, listed, reused
+
+
+def save_snapshot(snapshot, path):
+    """
+    Writes a snapshot as compact JSON.
+
+    :param snapshot: A snapshot from ``take_snapshot``.
+    :param path: The file to write.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(snapshot, file, separators=(",", ":"))
+
+
+def load_snapshot(path):
+    """
+    Reads a snapshot written by ``save_snapshot``.
 
-    recursive_map(directory)
-    return "\n".join(dir_map)
+    :param path: The snapshot file.
+    :return: The snapshot, or None if it is missing or from another SNAPSHOT_VERSION.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            snapshot = json.load(file)
+    except (OSError, ValueError) as e:
+        print(f"Warning: cannot load snapshot '{path}': {e}")
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        print(f"Warning: snapshot '{path}' has an unsupported version; ignoring it.")
+        return None
+    return snapshot
+
+
+def diff_snapshots(old, new):
+    """
+    Compares two snapshots of a tree.
+
+    Directories whose recorded entries are the very same object (reused by
+    ``take_snapshot``) are skipped without comparing them.
+
+    :param old: The earlier snapshot.
+    :param new: The later snapshot.
+    :return: (added, removed, changed) lists of paths relative to the root, sorted.
+    """
+    added, removed, changed = [], [], []
+
+    def join(relative, name):
+        return name if relative == os.curdir else os.path.join(relative, name)
+
+    for relative, record in new["dirs"].items():
+        before = old["dirs"].get(relative)
+        if before is None:
+            continue
+        if before["entries"] is record["entries"]:
+            continue
+        old_entries, new_entries = before["entries"], record["entries"]
+        for name, info in new_entries.items():
+            if name not in old_entries:
+                added.append(join(relative, name))
+            elif old_entries[name] != info:
+                (changed if not info[0] and not old_entries[name][0] else removed).append(join(relative, name))
+                if info[0] != old_entries[name][0]:
+                    added.append(join(relative, name))
+        for name in old_entries:
+            if name not in new_entries:
+                removed.append(join(relative, name))
+
+    # Everything inside added or removed directories
+    for relative, record in new["dirs"].items():
+        if relative not in old["dirs"]:
+            added.extend(join(relative, name) for name in record["entries"])
+    for relative, record in old["dirs"].items():
+        if relative not in new["dirs"]:
+            removed.extend(join(relative, name) for name in record["entries"])
+
+    return sorted(added), sorted(removed), sorted(changed)
+
+
+def snapshot_main(root_dir, exclude_dirs, args, output):
+    """Takes a snapshot, optionally diffs it against an earlier one, and saves it."""
+    previous = load_snapshot(args.diff_against) if args.diff_against else None
+    if args.diff_against and previous is not None and previous["root"] != os.path.abspath(root_dir):
+        print(f"Warning: snapshot '{args.diff_against}' was taken of '{previous['root']}'.")
+
+    start = time.perf_counter()
+    snapshot, listed, reused = take_snapshot(root_dir, exclude_dirs, previous)
+    print(f"Scanned {listed + reused} directories in {time.perf_counter() - start:.2f}s "
+          f"({listed} listed, {reused} unchanged).")
+
+    if previous is not None:
+        added, removed, changed = diff_snapshots(previous, snapshot)
+        lines = [f"+ {path}" for path in added] + [f"- {path}" for path in removed] + [f"~ {path}" for path in changed]
+        if args.output == "-":
+            if write_dir_map(lines, output):
+                output.write("\n")
+        else:
+            with open(args.output, "w", encoding="utf-8") as file:
+                write_dir_map(lines, file)
+            print(f"Changes written to '{args.output}'")
+        print(f"{len(added)} added, {len(removed)} removed, {len(changed)} changed.")
+
+    if args.snapshot:
+        save_snapshot(snapshot, args.snapshot)
+        print(f"Snapshot written to '{args.snapshot}'")
 
 
 def main():
@@ -65,34 +1110,97 @@ def main():
     parser.add_argument("-d", "--dir", default="./", help="Root directory to map (default: './').")
     parser.add_argument(
         "-e", "--exclude", nargs="*", default=None,
-        help="List of directories to exclude (default: reads from '.gitignore' and adds common ones like '.venv', 'build', etc.)."
+        help="List of names to exclude (default: applies every '.gitignore' in the tree and adds common ones like '.venv', 'build', etc.)."
     )
     parser.add_argument("-w", "--warn", type=int, default=50, help="Warn if a directory contains more than this many files (default: 50).")
-    parser.add_argument("-o", "--output", default="mappied.txt", help="Output file to save the directory map (default: 'mappied.txt').")
+    parser.add_argument(
+        "-j", "--workers", type=int, default=1,
+        help="Threads listing directories concurrently; helps on network filesystems (default: 1)."
+    )
+    parser.add_argument("-L", "--max-depth", type=int, default=None, help="Only map this many levels deep (default: no limit).")
+    parser.add_argument(
+        "-m", "--max-entries", type=int, default=None,
+        help="Show at most this many entries per directory and summarize the rest (default: no limit)."
+    )
+    parser.add_argument(
+        "-a", "--aggregate", action="store_true",
+        help="Annotate every entry with recursive file counts and sizes, like 'du', and report the heaviest subtrees."
+    )
+    parser.add_argument("--top", type=int, default=10, help="Heaviest subtrees to report with --aggregate (default: 10).")
+    parser.add_argument("--snapshot", help="Save a snapshot of the tree (entries, directory mtimes and inodes) to this file.")
+    parser.add_argument(
+        "--diff-against", metavar="SNAPSHOT",
+        help="Write added (+), removed (-) and changed (~) paths since SNAPSHOT instead of a map; "
+             "directories whose mtime and inode are unchanged are not listed again."
+    )
+    parser.add_argument(
+        "-f", "--format", choices=["text", "json", "ndjson"], default="text",
+        help="Write the map as a text tree, one compact nested JSON tree, or NDJSON with one node per line (default: text)."
+    )
+    parser.add_argument("--mtime", action="store_true", help="Include modification times (ns) in json and ndjson output.")
+    parser.add_argument(
+        "-o", "--output", default=None,
+        help="Output file to save the directory map, or '-' for stdout (default: 'mappied.txt', '.json' or '.ndjson')."
+    )
     args = parser.parse_args()
+    if args.aggregate and args.format != "text":
+        parser.error("--aggregate only writes text maps")
 
     root_dir = args.dir
-    output_file = args.output
+    output_file = args.output or {"text": "mappied.txt", "json": "mappied.json", "ndjson": "mappied.ndjson"}[args.format]
 
-    # Load exclusions
-    gitignore_patterns = read_gitignore(root_dir)
+    # Load exclusions: explicit names, or the default names plus every .gitignore in the tree
     default_exclusions = {".venv", "build", "node_modules", ".git", "__pycache__"}
-    exclude_dirs = set(args.exclude or gitignore_patterns + list(default_exclusions))
+    if args.exclude:
+        exclude_dirs = WalkFilter(args.exclude)
+    else:
+        exclude_dirs = WalkFilter(default_exclusions, gitignore=True)
+
+    # Status messages go to stderr when the map itself is written to stdout
+    output = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr if output_file == "-" else sys.stdout):
+        # Check if root directory exists
+        if not os.path.exists(root_dir):
+            print(f"Error: Directory '{root_dir}' does not exist.")
+            return
+
+        if args.snapshot or args.diff_against:
+            snapshot_main(root_dir, exclude_dirs, args, output)
+            return
 
-    # Check if root directory exists
-    if not os.path.exists(root_dir):
-        print(f"Error: Directory '{root_dir}' does not exist.")
-        return
+        # Stream the directory map to the output as it is walked
+        print(f"Generating directory map for '{root_dir}' (excluding: {exclude_dirs})...")
+        if args.aggregate:
+            tree, directories = scan_tree(root_dir, exclude_dirs=exclude_dirs, workers=args.workers)
+            lines = iter_aggregate_map(tree, max_depth=args.max_depth, max_entries=args.max_entries)
+        elif args.format == "text":
+            lines = iter_dir_map(root_dir, exclude_dirs=exclude_dirs, warn_threshold=args.warn, workers=args.workers,
+                                 max_depth=args.max_depth, max_entries=args.max_entries)
+        else:
+            events = walk_entries(root_dir, exclude_dirs=exclude_dirs, warn_threshold=args.warn, workers=args.workers,
+                                  max_depth=args.max_depth, max_entries=args.max_entries, sizes=True, mtimes=args.mtime)
+            lines = iter_ndjson_map(events) if args.format == "ndjson" else None
 
-    # Generate directory map
-    print(f"Generating directory map for '{root_dir}' (excluding: {exclude_dirs})...")
-    directory_map = create_dir_map(root_dir, exclude_dirs=exclude_dirs, warn_threshold=args.warn)
+        def write_map(file):
+            if lines is None:
+                write_json_map(events, file, os.path.basename(os.path.abspath(root_dir)))
+            else:
+                write_dir_map(lines, file)
 
-    # Write to output file
-    with open(output_file, "w", encoding="utf-8") as file:
-        file.write(directory_map)
+        if output_file == "-":
+            write_map(output)
+            output.write("\n")
+        else:
+            with open(output_file, "w", encoding="utf-8") as file:
+                write_map(file)
+                if args.format == "ndjson":
+                    file.write("\n")
+            print(f"Directory map written to '{output_file}'")
 
-    print(f"Directory map written to '{output_file}'")
+        if args.aggregate and args.top > 0:
+            print(f"\nHeaviest subtrees under '{root_dir}':")
+            for node in heaviest_directories(directories, args.top):
+                print(f"{format_size(node.size):>10}  {node.files:>10,} files  {node.path}")
 
 
 if __name__ == "__main__":
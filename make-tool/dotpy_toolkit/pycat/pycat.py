@@ -1,6 +1,36 @@
+import io
 import os
+import ast
+import bz2
+import sys
+import gzip
+import json
+import lzma
+import hashlib
+import codecs
+import tokenize
+import contextlib
+import collections
 import pyperclip
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:  # Optional: only needed for --compress zstd
+    zstandard = None
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_CLIPBOARD_LIMIT = 64 * 1024 * 1024
+MANIFEST_VERSION = 1
+BYTES_PER_TOKEN = 4  # Rough average for source code, used to turn token budgets into byte budgets
+IMPORT_CACHE_VERSION = 1
+IMPORT_CACHE_NAME = ".pycat-import-cache.json"
+PARALLEL_PARSE_MIN = 32  # Below this many files a process pool costs more than it saves
+SNIFF_BYTES = 8192
+DEFAULT_MAX_FILE_BYTES = 16 * 1024 * 1024
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "zstd": ".zst"}
+
 
 def collect_python_files(directory, include_files=None, skip_files=None, skip_dirs=None):
     """
@@ -56,32 +86,1174 @@ def collect_python_files(directory, include_files=None, skip_files=None, skip_di
     return python_files
 
 
-def write_files_to_text(file_paths, output_file):
+def sniff_file(file_path, max_file_bytes=None):
+    """
+    Checks a file cheaply before it is read: its size and its first few KB.
+
+    Args:
+        file_path (str): File to check.
+        max_file_bytes (int): Size above which the file counts as oversized (optional).
+
+    Returns:
+        tuple: (verdict, detail). The verdict is 'ok', 'oversized', 'binary',
+        'encoding' or 'unreadable'; the detail explains anything but 'ok'.
+    """
+    try:
+        size = os.stat(file_path).st_size
+        with open(file_path, 'rb') as file:
+            head = file.read(SNIFF_BYTES)
+    except OSError as e:
+        return "unreadable", str(e)
+
+    if b"\0" in head:
+        return "binary", "contains NUL bytes"
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(head).readline)
+        codecs.getincrementaldecoder(encoding)().decode(head, final=size <= SNIFF_BYTES)
+    except (SyntaxError, LookupError, UnicodeDecodeError) as e:
+        return "encoding", str(e)
+    if max_file_bytes and size > max_file_bytes:
+        return "oversized", f"{size} bytes, limit is {max_file_bytes}"
+    return "ok", None
+
+
+def screen_files(file_paths, max_file_bytes=DEFAULT_MAX_FILE_BYTES, oversize="skip", bad_encoding="skip", known=None):
     """
-    Writes the content of collected Python files to a text file.
+    Sniffs every file and applies the per-file policies.
+
+    Binary and unreadable files are always skipped. Oversized files are skipped or
+    truncated to ``max_file_bytes``, and files that do not decode are skipped or
+    kept as raw bytes, so a single bad file never stops the batch.
+
+    Files listed in ``known`` whose size and mtime still match were screened by
+    an earlier run and are kept without being opened.
+
+    Args:
+        file_paths (list of str): Files to screen.
+        max_file_bytes (int): Largest file written in full; 0 or None for no limit.
+        oversize (str): 'skip' or 'truncate' for files over ``max_file_bytes``.
+        bad_encoding (str): 'skip' or 'keep' for files that do not decode.
+        known (dict): Manifest entries by path from a previous incremental run (optional).
+
+    Returns:
+        tuple: (kept paths, {path: byte limit} for truncated files, [(path, reason)] for skipped files).
+    """
+    kept, limits, skipped = [], {}, []
+    for file_path in file_paths:
+        entry = known.get(file_path) if known else None
+        if entry is not None:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                stat = None
+            if stat is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                kept.append(file_path)
+                continue
+        verdict, detail = sniff_file(file_path, max_file_bytes)
+        if verdict == "oversized" and oversize == "truncate":
+            limits[file_path] = max_file_bytes
+        elif verdict == "encoding" and bad_encoding == "keep":
+            pass
+        elif verdict != "ok":
+            skipped.append((file_path, f"{verdict}: {detail}"))
+            continue
+        kept.append(file_path)
+    return kept, limits, skipped
+
+
+def read_head(file_path, limit):
+    """
+    Reads a truncated file: at most ``limit`` bytes, cut back to the last full line.
+
+    Returns:
+        bytes: The kept lines followed by a comment saying where the file was cut.
+    """
+    return b"".join(_read_truncated(file_path, limit))
+
+
+def _read_truncated(file_path, limit):
+    """Returns (kept lines, truncation comment) for ``read_head``."""
+    size = os.stat(file_path).st_size
+    with open(file_path, 'rb') as file:
+        head = file.read(limit)
+    if len(head) == limit and b"\n" in head:
+        head = head[:head.rindex(b"\n") + 1]
+    return head, f"# [pycat] truncated after {len(head)} of {size} bytes\n".encode("utf-8")
+
+
+def _report_skipped(skipped, limits):
+    if limits:
+        print(f"Truncated {len(limits)} oversized file(s).")
+    if skipped:
+        print(f"Skipped {len(skipped)} file(s):")
+        for file_path, reason in skipped:
+            print(f"  {file_path} ({reason})")
+
+
+def parse_imports(file_path):
+    """
+    Lists the imports of a Python file.
+
+    Args:
+        file_path (str): Python file to parse.
+
+    Returns:
+        list of list: [level, module, names] per import statement; ``import a.b``
+        is recorded as [0, "a.b", []]. Files that do not parse have no imports.
+    """
+    try:
+        with open(file_path, 'rb') as file:
+            tree = ast.parse(file.read())
+    except (OSError, SyntaxError, ValueError):
+        return []
+
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend([0, alias.name, []] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append([node.level, node.module or "", [alias.name for alias in node.names]])
+    return imports
+
+
+def load_import_cache(cache_file):
+    """Loads cached import lists keyed by file path; returns {} if the cache is missing or stale."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as file:
+            cache = json.load(file)
+        if cache.get("version") != IMPORT_CACHE_VERSION:
+            return {}
+        return cache["files"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        return {}
+
+
+def save_import_cache(cache_file, entries):
+    """Writes import lists keyed by file path, each with the size and mtime it was parsed at."""
+    temp_path = f"{cache_file}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump({"version": IMPORT_CACHE_VERSION, "files": entries}, file)
+    os.replace(temp_path, cache_file)
+
+
+def _module_names(python_files, directory):
+    """
+    Maps dotted module names to files.
+
+    Every file is registered relative to ``directory`` and relative to the first
+    parent directory that is not a package, so 'src/pkg/mod.py' answers to both
+    'src.pkg.mod' and 'pkg.mod'.
+    """
+    package_dirs = {os.path.dirname(path) for path in python_files if os.path.basename(path) == "__init__.py"}
+    modules = {}
+    file_modules = {}
+    for path in python_files:
+        root = os.path.dirname(path)
+        while root in package_dirs:
+            root = os.path.dirname(root)
+        names = []
+        for base in (directory, root):
+            parts = os.path.splitext(os.path.relpath(path, base))[0].split(os.sep)
+            if parts[-1] == "__init__":
+                parts = parts[:-1]
+            if parts and all(part.isidentifier() for part in parts):
+                names.append(".".join(parts))
+        for name in names:
+            modules.setdefault(name, path)
+        file_modules[path] = names[-1] if names else None
+    return modules, file_modules
+
+
+def _resolve_imports(file_path, module, imports, modules):
+    """Yields the in-repo files an import list refers to, including parent packages."""
+    is_package = os.path.basename(file_path) == "__init__.py"
+    for level, target, names in imports:
+        if level:
+            if module is None:
+                continue
+            package = module.split(".") if is_package else module.split(".")[:-1]
+            if level - 1 > len(package):
+                continue
+            package = package[:len(package) - (level - 1)]
+            target = ".".join(package + ([target] if target else []))
+        candidates = [f"{target}.{name}" for name in names if name != "*"] + [target]
+        parts = target.split(".")
+        candidates += [".".join(parts[:i]) for i in range(1, len(parts))]
+        for candidate in candidates:
+            if candidate in modules:
+                yield modules[candidate]
+
+
+def select_reachable_files(python_files, directory, entry_points, jobs=None, cache_file=None):
+    """
+    Keeps only the files reachable through imports from the given entry points.
+
+    Imports are read with ``ast`` and followed breadth-first through the in-repo
+    modules in ``python_files``. Each round of newly reached files is parsed in a
+    process pool, and import lists are cached in ``cache_file`` by size and mtime
+    so unchanged files are not parsed again on the next run.
+
+    Args:
+        python_files (list of str): Candidate files, as returned by ``collect_python_files``.
+        directory (str): Root directory the candidates were collected from.
+        entry_points (list of str): Entry file paths or dotted module names.
+        jobs (int): Number of worker processes (default: CPU count).
+        cache_file (str): Import cache path (default: '.pycat-import-cache.json' in ``directory``).
+
+    Returns:
+        list of str: Reachable files, in the same order as ``python_files``.
+    """
+    modules, file_modules = _module_names(python_files, directory)
+    known_files = {os.path.abspath(path): path for path in python_files}
+    cache_file = cache_file or os.path.join(directory, IMPORT_CACHE_NAME)
+    cache = load_import_cache(cache_file)
+    fresh_cache = {path: entry for path, entry in cache.items() if path in file_modules}
+
+    frontier = []
+    for entry in entry_points:
+        path = modules.get(entry) or known_files.get(os.path.abspath(entry))
+        if path is None:
+            print(f"Entry point not found among collected files: {entry}")
+        else:
+            # Importing the entry module also runs its parent packages
+            module = file_modules[path]
+            frontier.append(path)
+            if module:
+                frontier.extend(_resolve_imports(path, module, [[0, module, []]], modules))
+
+    frontier = list(dict.fromkeys(frontier))
+    reached = set(frontier)
+    parsed = 0
+    while frontier:
+        stats = {path: os.stat(path) for path in frontier}
+        imports = {}
+        misses = []
+        for path in frontier:
+            cached = cache.get(path)
+            if cached and cached["size"] == stats[path].st_size and cached["mtime_ns"] == stats[path].st_mtime_ns:
+                imports[path] = cached["imports"]
+            else:
+                misses.append(path)
+
+        if len(misses) >= PARALLEL_PARSE_MIN and jobs != 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = executor.map(parse_imports, misses, chunksize=max(1, len(misses) // 64))
+                imports.update(zip(misses, results))
+        else:
+            imports.update((path, parse_imports(path)) for path in misses)
+        parsed += len(misses)
+
+        next_frontier = []
+        for path in frontier:
+            fresh_cache[path] = {
+                "size": stats[path].st_size,
+                "mtime_ns": stats[path].st_mtime_ns,
+                "imports": imports[path],
+            }
+            for target in _resolve_imports(path, file_modules[path], imports[path], modules):
+                if target not in reached:
+                    reached.add(target)
+                    next_frontier.append(target)
+        frontier = next_frontier
+
+    try:
+        save_import_cache(cache_file, fresh_cache)
+    except OSError as e:
+        print(f"Could not write import cache {cache_file}: {e}")
+    print(f"Reachable set: {len(reached)} of {len(python_files)} file(s), {parsed} parsed, "
+          f"{len(reached) - parsed} from cache.")
+    return [path for path in python_files if path in reached]
+
+
+class ClipboardSink:
+    """
+    Collects the streamed output for the clipboard, up to a fixed byte limit.
+
+    Once the limit is exceeded the collected data is dropped and nothing more is
+    kept, so the sink never holds more than ``limit`` bytes.
+    """
+
+    def __init__(self, limit=DEFAULT_CLIPBOARD_LIMIT):
+        self.limit = limit
+        self.size = 0
+        self.overflowed = False
+        self._chunks = []
+
+    def write(self, data):
+        if self.overflowed:
+            return
+        if self.size + len(data) > self.limit:
+            self.overflowed = True
+            self._chunks = []
+            return
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+
+    def copy(self):
+        """
+        Copies the collected output to the clipboard.
+
+        Returns:
+            bool: True if the content was copied, False if it was over the limit.
+        """
+        if self.overflowed:
+            return False
+        content = b"".join(self._chunks).decode("utf-8", errors="replace")
+        self._chunks = []
+        pyperclip.copy(content)
+        return True
+
+
+def available_compressors():
+    """Returns the names of the --compress codecs usable in this environment."""
+    return [name for name in COMPRESSION_EXTENSIONS if name != "zstd" or zstandard is not None]
+
+
+def compressed_name(output_file, compress):
+    """Adds the codec's file extension to an output path, unless it is stdout or already has it."""
+    if not compress or output_file == "-":
+        return output_file
+    extension = COMPRESSION_EXTENSIONS[compress]
+    return output_file if output_file.endswith(extension) else output_file + extension
+
+
+def _compressor(raw, compress):
+    """Wraps a binary stream in a streaming compressor that leaves ``raw`` open on close."""
+    if compress == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6)
+    if compress == "bz2":
+        return bz2.BZ2File(raw, mode='wb')
+    if compress == "xz":
+        return lzma.LZMAFile(raw, mode='wb')
+    if compress == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package.")
+        return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    raise ValueError(f"Unknown compression: {compress}")
+
+
+@contextlib.contextmanager
+def open_output(output_file, compress=None):
+    """
+    Opens pycat output for binary writing.
+
+    Args:
+        output_file (str): Output path, or '-' for stdout.
+        compress (str): Codec from ``COMPRESSION_EXTENSIONS`` to stream the output through (optional).
+
+    Yields:
+        file: Binary stream to write to. Compressed data is written as it is produced,
+        so the uncompressed output never touches disk.
+    """
+    if output_file == "-":
+        # sys.stdout may be redirected to stderr for progress messages; write to the real one
+        raw = sys.__stdout__.buffer
+    else:
+        raw = open(output_file, 'wb')
+    try:
+        stream = _compressor(raw, compress) if compress else raw
+        try:
+            yield stream
+        finally:
+            if stream is not raw:
+                stream.close()
+    finally:
+        if raw is sys.__stdout__.buffer:
+            raw.flush()
+        else:
+            raw.close()
+
+
+class CatWriter:
+    """
+    Writes pycat output to a binary stream and fans every chunk out to extra sinks.
+
+    Args:
+        output (file): Binary file object opened for writing.
+        sinks (list): Extra binary sinks fed with the same bytes (optional).
+        chunk_size (int): Maximum number of bytes read from a source file at once.
+    """
+
+    def __init__(self, output, sinks=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.output = output
+        self.sinks = list(sinks or [])
+        self.chunk_size = chunk_size
+        self.offset = 0
+        # Compressors expose the fileno() of the file they wrap, so only plain files qualify
+        self._sendfile = hasattr(os, "sendfile") and not self.sinks and isinstance(output, io.BufferedWriter)
+
+    def write(self, data):
+        self.output.write(data)
+        for sink in self.sinks:
+            sink.write(data)
+        self.offset += len(data)
+
+    def copy_file(self, file_path, digest=None):
+        """
+        Copies a whole source file into the output.
+
+        Args:
+            file_path (str): File to copy.
+            digest (hashlib hash): Hash object updated with the copied bytes (optional).
+
+        Returns:
+            int: Number of bytes copied.
+        """
+        with open(file_path, 'rb') as source:
+            return self.copy_range(source, 0, None, digest=digest)
+
+    def copy_range(self, source, offset, length, digest=None):
+        """
+        Copies ``length`` bytes starting at ``offset`` from an open binary file.
+
+        Args:
+            source (file): Binary file object to copy from.
+            offset (int): Position in ``source`` to start at.
+            length (int): Number of bytes to copy, or None to copy up to the end.
+            digest (hashlib hash): Hash object updated with the copied bytes (optional).
+
+        Returns:
+            int: Number of bytes copied.
+        """
+        if self._sendfile and digest is None:
+            copied = self._copy_sendfile(source, offset, length)
+            if copied is not None:
+                return copied
+            # Not a regular fd pair (pipes, wrapped streams...): use the chunked copy.
+            self._sendfile = False
+        source.seek(offset)
+        return self._copy_chunks(source, length, digest)
+
+    def _copy_chunks(self, source, length, digest):
+        copied = 0
+        buffer = bytearray(self.chunk_size)
+        view = memoryview(buffer)
+        while length is None or copied < length:
+            want = self.chunk_size if length is None else min(self.chunk_size, length - copied)
+            count = source.readinto(view[:want])
+            if not count:
+                break
+            self.write(view[:count])
+            if digest is not None:
+                digest.update(view[:count])
+            copied += count
+        return copied
+
+    def _copy_sendfile(self, source, offset, length):
+        try:
+            self.output.flush()
+            out_fd = self.output.fileno()
+            in_fd = source.fileno()
+        except (AttributeError, OSError, ValueError):
+            return None
+        copied = 0
+        while length is None or copied < length:
+            want = self.chunk_size if length is None else min(self.chunk_size, length - copied)
+            try:
+                sent = os.sendfile(out_fd, in_fd, offset + copied, want)
+            except OSError:
+                if copied:
+                    raise
+                return None
+            if not sent:
+                break
+            copied += sent
+        self.offset += copied
+        return copied
+
+
+def hash_file(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Hashes a file's content in chunks.
+
+    Args:
+        file_path (str): File to hash.
+        chunk_size (int): Bytes read per step.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_path_for(output_file):
+    """Returns the path of the sidecar manifest kept next to an output file."""
+    return f"{output_file}.manifest.json"
+
+
+def load_manifest(output_file):
+    """
+    Loads the manifest written by a previous incremental run.
+
+    The manifest is ignored when it is missing, was written by another manifest
+    version, or no longer matches the size of the output it describes.
+
+    Args:
+        output_file (str): Output file the manifest belongs to.
+
+    Returns:
+        dict: Manifest entries keyed by source file path (empty if unusable).
+    """
+    try:
+        with open(manifest_path_for(output_file), 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        if os.path.getsize(output_file) != manifest.get("output_size"):
+            return {}
+        return {entry["path"]: entry for entry in manifest["files"]}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
+
+
+def save_manifest(output_file, entries, output_size):
+    """
+    Writes the manifest for an output file.
+
+    Args:
+        output_file (str): Output file the manifest describes.
+        entries (list of dict): One entry per source file with path, size, mtime_ns, hash, offset and length.
+        output_size (int): Total size of the output file in bytes.
+    """
+    manifest_path = manifest_path_for(output_file)
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump({"version": MANIFEST_VERSION, "output_size": output_size, "files": entries}, file)
+    os.replace(temp_path, manifest_path)
+
+
+def strip_source(data):
+    """
+    Removes comments, docstrings and redundant blank lines from Python source.
+
+    Works on the ``tokenize`` stream, so no AST is built. When every statement of
+    a block is a removed string, the last one is replaced by ``pass`` to keep the
+    code valid.
+    Trailing whitespace is dropped, lines emptied by the removal disappear and
+    runs of blank lines collapse to one. Source that does not tokenize is
+    returned unchanged.
+
+    Args:
+        data (bytes): Source file content.
+
+    Returns:
+        tuple: (stripped bytes, line map). The line map is a list of
+        [output_line, source_line, count] runs: ``count`` consecutive output lines
+        starting at ``output_line`` come from consecutive source lines starting
+        at ``source_line``.
+    """
+    identity = [[1, 1, data.count(b"\n") + 1]]
+    try:
+        tokens = list(tokenize.tokenize(io.BytesIO(data).readline))
+        encoding = tokens[0].string if tokens[0].type == tokenize.ENCODING else "utf-8"
+        lines = [line.decode(encoding) for line in io.BytesIO(data)]
+    except (tokenize.TokenError, SyntaxError, UnicodeDecodeError, IndexError):
+        return data, identity
+
+    cuts = collections.defaultdict(list)  # row -> [(start_col, end_col or None, replacement)]
+
+    def cut(start, end, replacement=""):
+        (start_row, start_col), (end_row, end_col) = start, end
+        if start_row == end_row:
+            cuts[start_row].append((start_col, end_col, replacement))
+            return
+        cuts[start_row].append((start_col, None, replacement))
+        for row in range(start_row + 1, end_row):
+            cuts[row].append((0, None, ""))
+        cuts[end_row].append((0, end_col, ""))
+
+    skip = (tokenize.NL, tokenize.COMMENT, tokenize.ENCODING)
+    at_statement_start = True
+    # One [any statement kept, span of the last removed string] per open block, the module first
+    blocks = [[True, None]]
+    verbatim = set()  # Rows whose line break is inside a string literal
+    for index, token in enumerate(tokens):
+        if token.end[0] > token.start[0] and token.type not in (tokenize.NEWLINE, tokenize.NL):
+            verbatim.update(range(token.start[0], token.end[0]))
+        if token.type == tokenize.COMMENT:
+            cut(token.start, token.end)
+            continue
+        if token.type in skip:
+            continue
+        if token.type == tokenize.STRING and at_statement_start:
+            end = index
+            while tokens[end + 1].type == tokenize.STRING:
+                end += 1
+            following = end + 1
+            while tokens[following].type == tokenize.COMMENT:
+                following += 1
+            # Before 3.12 f-strings are STRING tokens too, and evaluating one runs code, so it is kept
+            # (the prefix is everything before the first quote, which is the closing quote character)
+            formatted = any("f" in tokens[i].string.split(tokens[i].string[-1], 1)[0].lower()
+                            for i in range(index, end + 1))
+            if tokens[following].type in (tokenize.NEWLINE, tokenize.ENDMARKER) and not formatted:
+                # A bare string statement: a docstring, or dead code all the same. The last one of
+                # a block is only cut once the block ends, when it is known whether it needs a 'pass'
+                if blocks[-1][1] is not None:
+                    cut(*blocks[-1][1])
+                blocks[-1][1] = (token.start, tokens[end].end)
+            else:
+                blocks[-1][0] = True
+        elif at_statement_start and token.type not in (tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT):
+            blocks[-1][0] = True
+        if token.type == tokenize.INDENT:
+            blocks.append([False, None])
+        elif token.type == tokenize.DEDENT:
+            kept, removed = blocks.pop()
+            if removed is not None:
+                cut(*removed, "" if kept else "pass")
+        at_statement_start = token.type in (tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT)
+    if blocks[0][1] is not None:
+        cut(*blocks[0][1])
+
+    output = []
+    line_map = []
+    blank = True  # Also drops blank lines at the top of the file
+    for row, line in enumerate(lines, start=1):
+        text = line.rstrip("\r\n")
+        if row in cuts:
+            for start_col, end_col, replacement in sorted(cuts[row], reverse=True):
+                text = text[:start_col] + replacement + (text[end_col:] if end_col is not None else "")
+            if not text.strip():
+                continue
+        if row in verbatim:
+            blank = False
+            output.append(text)
+            _extend_line_map(line_map, len(output), row)
+            continue
+        text = text.rstrip()
+        if not text:
+            if blank:
+                continue
+            blank = True
+        else:
+            blank = False
+        output.append(text)
+        _extend_line_map(line_map, len(output), row)
+
+    stripped = "\n".join(output) + ("\n" if output else "")
+    return stripped.encode("utf-8"), line_map
+
+
+def _extend_line_map(line_map, output_line, source_line):
+    """Adds one output line to a run-length line map."""
+    if line_map:
+        last_output, last_source, count = line_map[-1]
+        if last_output + count == output_line and last_source + count == source_line:
+            line_map[-1][2] += 1
+            return
+    line_map.append([output_line, source_line, 1])
+
+
+def strip_file(file_path, limit=None):
+    """Reads a file (truncated to ``limit`` bytes with ``read_head`` if given) and returns ``strip_source`` of it."""
+    if limit:
+        head, note = _read_truncated(file_path, limit)
+        stripped, line_map = strip_source(head)
+        return stripped + note, line_map
+    with open(file_path, 'rb') as file:
+        return strip_source(file.read())
+
+
+def iter_stripped(file_paths, jobs=None, limits=None):
+    """
+    Strips files in a process pool and yields the results in input order.
+
+    Only a bounded window of files is in flight at once, so memory does not grow
+    with the number of files while the output order stays deterministic.
+
+    Args:
+        file_paths (list of str): Files to strip.
+        jobs (int): Number of worker processes (default: CPU count; 1 strips in-process).
+        limits (dict): Byte limits for files that must be truncated (optional).
+
+    Yields:
+        tuple: (file path, stripped bytes, line map).
+    """
+    limits = limits or {}
+    if jobs == 1 or len(file_paths) < PARALLEL_PARSE_MIN:
+        for file_path in file_paths:
+            yield (file_path,) + strip_file(file_path, limits.get(file_path))
+        return
+
+    window = 4 * (jobs or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = collections.deque()
+        for file_path in file_paths:
+            pending.append((file_path, executor.submit(strip_file, file_path, limits.get(file_path))))
+            if len(pending) >= window:
+                done_path, future = pending.popleft()
+                yield (done_path,) + future.result()
+        while pending:
+            done_path, future = pending.popleft()
+            yield (done_path,) + future.result()
+
+
+def linemap_path_for(output_file):
+    """Returns the path of the line map written next to stripped output."""
+    return f"{output_file}.linemap.json"
+
+
+class Deduplicator:
+    """
+    Spots files whose content was already written earlier in the same run.
+
+    Only files that share their size with another file can be duplicates, so
+    every other file is never hashed. The first file of a given size is hashed
+    while it is being copied; later files of that size are hashed before they are
+    written, and replaced by a back-reference when their content was seen before.
+
+    Args:
+        file_paths (list of str): All files that will be written, used to find shared sizes.
+    """
+
+    def __init__(self, file_paths):
+        self.sizes = {path: os.stat(path).st_size for path in file_paths}
+        seen = set()
+        self._shared_sizes = set()
+        for size in self.sizes.values():
+            (self._shared_sizes if size in seen else seen).add(size)
+        self._written = {}
+        self._written_sizes = set()
+        self.duplicates = 0
+        self.saved_bytes = 0
+
+    def wants_digest(self, file_path):
+        """Whether a file's digest must be recorded when it is written in full."""
+        return self.sizes.get(file_path) in self._shared_sizes
+
+    def check(self, file_path):
+        """
+        Looks for an earlier file with the same content.
+
+        Returns:
+            tuple: (original path or None, digest or None). The digest is returned
+            when it had to be computed, so the caller can ``record`` it.
+        """
+        size = self.sizes.get(file_path)
+        if size not in self._written_sizes:
+            return None, None
+        digest = hash_file(file_path)
+        original = self._written.get((size, digest))
+        if original is None or size <= len(duplicate_note(original)):
+            return None, digest
+        self.duplicates += 1
+        self.saved_bytes += size - len(duplicate_note(original))
+        return original, digest
+
+    def record(self, file_path, digest):
+        """Remembers a file that was written in full."""
+        size = self.sizes.get(file_path)
+        self._written.setdefault((size, digest), file_path)
+        self._written_sizes.add(size)
+
+
+def duplicate_note(original):
+    """Body written in place of a file whose content already appeared as ``original``."""
+    return f"# Duplicate of {original}".encode("utf-8")
+
+
+def _copy_body(writer, file_path, dedup=None, digest=None):
+    """Copies a file in full, recording its digest for deduplication when needed."""
+    if dedup is not None and digest is None and dedup.wants_digest(file_path):
+        hasher = hashlib.blake2b(digest_size=16)
+        writer.copy_file(file_path, digest=hasher)
+        dedup.record(file_path, hasher.hexdigest())
+        return
+    writer.copy_file(file_path)
+    if dedup is not None and digest is not None:
+        dedup.record(file_path, digest)
+
+
+def _write_section(writer, file_path, dedup=None, data=None):
+    """
+    Writes one '# Section' block: header, file content (or back-reference) and a blank line.
+
+    Returns:
+        bool: True if the file was written as a back-reference to an earlier duplicate.
+    """
+    original, digest = dedup.check(file_path) if dedup is not None else (None, None)
+    writer.write(f"# Section {file_path}\n".encode("utf-8"))
+    if original:
+        writer.write(duplicate_note(original))
+    elif data is not None:
+        writer.write(data)
+        if dedup is not None and dedup.wants_digest(file_path):
+            dedup.record(file_path, digest or hash_file(file_path))
+    else:
+        _copy_body(writer, file_path, dedup, digest)
+    writer.write(b"\n\n")
+    return bool(original)
+
+
+def shard_path(output_file, number):
+    """Returns the path of the numbered shard for an output file, e.g. 'pyCat-all-0001.txt'."""
+    base, ext = os.path.splitext(output_file)
+    return f"{base}-{number:04d}{ext or '.txt'}"
+
+
+def shard_index_path(output_file):
+    """Returns the path of the shard index written next to the shards."""
+    base, _ = os.path.splitext(output_file)
+    return f"{base}-index.json"
+
+
+def split_on_definitions(data, budget):
+    """
+    Splits Python source into parts of at most ``budget`` bytes at definition boundaries.
+
+    Cut points are the first lines of top-level statements and of statements in
+    class bodies (decorators included), so functions and methods are never cut in
+    half. A single definition larger than the budget becomes a part of its own.
+    Source that does not parse is split on plain line boundaries.
+
+    Args:
+        data (bytes): Source file content.
+        budget (int): Target maximum size of each part in bytes.
+
+    Returns:
+        list of tuple: (start_line, end_line, bytes) for each part, lines 1-based and inclusive.
+    """
+    lines = data.splitlines(keepends=True)
+    try:
+        tree = ast.parse(data)
+        cuts = set()
+        for node in tree.body:
+            nodes = [node] + (node.body if isinstance(node, ast.ClassDef) else [])
+            for child in nodes:
+                decorators = getattr(child, "decorator_list", [])
+                cuts.add(min([child.lineno] + [d.lineno for d in decorators]))
+    except (SyntaxError, ValueError):
+        cuts = set(range(1, len(lines) + 1))
+    cuts.discard(1)
+
+    parts = []
+    start, size = 1, 0
+    for lineno, line in enumerate(lines, start=1):
+        if lineno in cuts and size and size + _block_size(lines, lineno, cuts) > budget:
+            parts.append((start, lineno - 1, b"".join(lines[start - 1:lineno - 1])))
+            start, size = lineno, 0
+        size += len(line)
+    if start <= len(lines):
+        parts.append((start, len(lines), b"".join(lines[start - 1:])))
+    return parts
+
+
+def _block_size(lines, lineno, cuts):
+    """Size in bytes of the block starting at ``lineno`` and running to the next cut point."""
+    size = 0
+    for index in range(lineno - 1, len(lines)):
+        if index + 1 != lineno and index + 1 in cuts:
+            break
+        size += len(lines[index])
+    return size
+
+
+class ShardWriter:
+    """
+    Writes pycat sections into numbered shard files of at most ``budget`` bytes.
+
+    Shards are opened as the data streams through and always end on a section
+    boundary. A file larger than the budget is split with ``split_on_definitions``.
+
+    Args:
+        output_file (str): Base output path; shards are named after it with ``shard_path``.
+        budget (int): Target maximum size of a shard in bytes.
+        sinks (list): Extra binary sinks fed with the same bytes (optional).
+        chunk_size (int): Maximum number of bytes read from a source file at once.
+        dedup (Deduplicator): Replaces repeated file contents with back-references (optional).
+        compress (str): Codec each shard is streamed through (optional).
+    """
+
+    def __init__(self, output_file, budget, sinks=None, chunk_size=DEFAULT_CHUNK_SIZE, dedup=None, compress=None):
+        self.output_file = output_file
+        self.budget = budget
+        self.sinks = sinks
+        self.chunk_size = chunk_size
+        self.dedup = dedup
+        self.compress = compress
+        self.shards = []
+        self.writer = None
+        self._output = None
+        self._stack = contextlib.ExitStack()
+
+    def add_file(self, file_path, data=None):
+        """
+        Adds one file as a section, or as several when it is over budget.
+
+        Args:
+            file_path (str): File to add.
+            data (bytes): Content to write instead of the file's own, e.g. stripped source (optional).
+
+        Returns:
+            bool: True if the file was written as a back-reference to an earlier duplicate.
+        """
+        header = f"# Section {file_path}\n".encode("utf-8")
+        original, digest = self.dedup.check(file_path) if self.dedup is not None else (None, None)
+        if original:
+            note = duplicate_note(original)
+            self._reserve(len(header) + len(note) + 2)
+            self.writer.write(header)
+            self.writer.write(note)
+            self.writer.write(b"\n\n")
+            self.shards[-1]["sections"].append({"path": file_path, "duplicate_of": original})
+            return True
+
+        size = len(header) + (os.stat(file_path).st_size if data is None else len(data)) + 2
+        if size <= self.budget and data is None:
+            self._reserve(size)
+            self.writer.write(header)
+            _copy_body(self.writer, file_path, self.dedup, digest)
+            self.writer.write(b"\n\n")
+            self.shards[-1]["sections"].append({"path": file_path})
+            return False
+
+        if self.dedup is not None and self.dedup.wants_digest(file_path):
+            self.dedup.record(file_path, digest or hash_file(file_path))
+        if size <= self.budget:
+            self._reserve(size)
+            self.writer.write(header)
+            self.writer.write(data)
+            self.writer.write(b"\n\n")
+            self.shards[-1]["sections"].append({"path": file_path})
+            return False
+
+        # Oversized file: only this one is read whole, to find definition boundaries
+        if data is None:
+            with open(file_path, 'rb') as file:
+                data = file.read()
+        overhead = len(header) + len(" (lines -)".encode("utf-8")) + 2 * len(str(data.count(b"\n") + 1)) + 2
+        for start, end, part in split_on_definitions(data, max(1, self.budget - overhead)):
+            part_header = f"# Section {file_path} (lines {start}-{end})\n".encode("utf-8")
+            self._reserve(len(part_header) + len(part) + 2)
+            self.writer.write(part_header)
+            self.writer.write(part)
+            self.writer.write(b"\n\n")
+            self.shards[-1]["sections"].append({"path": file_path, "start_line": start, "end_line": end})
+        return False
+
+    def _reserve(self, size):
+        """Starts a new shard if ``size`` more bytes would push the current one over budget."""
+        if self.writer is None or (self.writer.offset and self.writer.offset + size > self.budget):
+            self._open_next()
+
+    def _open_next(self):
+        self._close_current()
+        path = compressed_name(shard_path(self.output_file, len(self.shards) + 1), self.compress)
+        self._output = self._stack.enter_context(open_output(path, self.compress))
+        self.writer = CatWriter(self._output, sinks=self.sinks, chunk_size=self.chunk_size)
+        self.shards.append({"file": path, "bytes": 0, "sections": []})
+
+    def _close_current(self):
+        if self._output is not None:
+            self.shards[-1]["bytes"] = self.writer.offset
+            self._stack.close()
+            self._output = None
+
+    def close(self):
+        """Closes the last shard and writes the shard index."""
+        self._close_current()
+        with open(shard_index_path(self.output_file), 'w', encoding='utf-8') as file:
+            json.dump({"budget_bytes": self.budget, "shards": self.shards}, file, indent=4)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_current()
+
+
+def write_files_to_text(file_paths, output_file, sinks=None, chunk_size=DEFAULT_CHUNK_SIZE, incremental=False,
+                        shard_bytes=None, dedup=False, compress=None, strip=False, jobs=None,
+                        max_file_bytes=DEFAULT_MAX_FILE_BYTES, oversize="skip", bad_encoding="skip"):
+    """
+    Streams the content of collected Python files into a text file.
+
+    Every file is screened first with ``screen_files``: binary, unreadable,
+    oversized and undecodable files are skipped (or truncated/kept as the
+    policies say) and listed in a summary instead of failing the run.
+
+    Each file is copied in chunks of at most ``chunk_size`` bytes, so memory use
+    does not depend on the size of the files or of the tree. When no extra sinks
+    are attached the copy is handed to the kernel with ``os.sendfile``.
+
+    In incremental mode a manifest of every file's size, mtime, content hash and
+    segment offset is kept next to the output. Files whose size and mtime (or,
+    failing that, hash) match the manifest are copied straight from the previous
+    output; only changed files are read.
+
+    With ``shard_bytes`` the output is split into numbered shard files of about
+    that size instead (see ``ShardWriter``), plus a shard index file.
+
+    With ``dedup`` a file whose content already appeared earlier in the output is
+    written as a one-line back-reference instead (see ``Deduplicator``).
+
+    An ``output_file`` of '-' streams to stdout, and ``compress`` streams the
+    output (or each shard) through gzip, bz2, xz or zstd as it is written.
+
+    With ``strip`` every file goes through ``strip_source`` in a process pool
+    first, and a line map from output lines back to source lines is written
+    next to the output.
 
     Args:
         file_paths (list of str): List of Python file paths to write.
-        output_file (str): Output text file to write the content to.
+        output_file (str): Output text file to write the content to, or '-' for stdout.
+        sinks (list): Extra binary sinks (objects with ``write(bytes)``) fed from the same pass (optional).
+        chunk_size (int): Maximum number of bytes held in memory per copy step.
+        incremental (bool): Reuse unchanged segments of the previous output and keep a manifest.
+        shard_bytes (int): Split the output into shards of at most this many bytes (optional).
+        dedup (bool): Write repeated file contents only once.
+        compress (str): Codec from ``COMPRESSION_EXTENSIONS`` (optional); its extension is added to the output name.
+        strip (bool): Drop comments, docstrings and redundant blank lines.
+        jobs (int): Worker processes used by ``strip`` (default: CPU count).
+        max_file_bytes (int): Largest file written in full; 0 or None for no limit.
+        oversize (str): 'skip' or 'truncate' files over ``max_file_bytes``.
+        bad_encoding (str): 'skip' or 'keep' files that do not decode.
 
     Returns:
         bool: True if writing is successful, False otherwise.
     """
+    if incremental and (shard_bytes or dedup or compress or strip or output_file == "-"):
+        print("Error writing files: incremental mode needs a plain, unsharded, undeduplicated, unstripped output file.")
+        return False
+    if shard_bytes and output_file == "-":
+        print("Error writing files: sharded output cannot be written to stdout.")
+        return False
+
+    # Files unchanged since the last incremental run are reused as they are, so they are not sniffed again
+    previous = load_manifest(compressed_name(output_file, compress)) if incremental else {}
+    file_paths, limits, skipped = screen_files(file_paths, max_file_bytes, oversize, bad_encoding, previous)
+    _report_skipped(skipped, limits)
+    if not file_paths:
+        print("Error writing files: every file was skipped.")
+        return False
+
     try:
-        with open(output_file, 'w') as output:
-            for file_path in file_paths:
-                with open(file_path, 'r') as file:
-                    output.write(f"# Section {file_path}\n")
-                    output.write(file.read())
-                    output.write("\n\n")
-        print(f"Successfully pyCatenated to {output_file}.")
+        dedup = Deduplicator(file_paths) if dedup else None
+    except OSError as e:
+        print(f"Error writing files: {e}")
+        return False
+
+    if strip:
+        sections = iter_stripped(file_paths, jobs, limits)
+    else:
+        sections = ((file_path, read_head(file_path, limits[file_path]) if file_path in limits else None, None)
+                    for file_path in file_paths)
+    line_maps = {}
+
+    if shard_bytes:
+        try:
+            with ShardWriter(output_file, shard_bytes, sinks=sinks, chunk_size=chunk_size, dedup=dedup,
+                             compress=compress) as shards:
+                for file_path, data, line_map in sections:
+                    if not shards.add_file(file_path, data) and line_map:
+                        line_maps[file_path] = line_map
+            _report_dedup(dedup)
+            if strip:
+                _save_line_maps(output_file, line_maps)
+            print(f"Successfully pyCatenated to {len(shards.shards)} shard(s), index in {shard_index_path(output_file)}.")
+            return True
+        except Exception as e:
+            print(f"Error writing files: {e}")
+            return False
+
+    output_file = compressed_name(output_file, compress)
+    target_file = f"{output_file}.tmp" if previous else output_file
+    entries = []
+    reused = 0
+
+    try:
+        with open_output(target_file, compress) as output:
+            writer = CatWriter(output, sinks=sinks, chunk_size=chunk_size)
+            if not incremental:
+                for file_path, data, line_map in sections:
+                    if not _write_section(writer, file_path, dedup, data) and line_map:
+                        line_maps[file_path] = line_map
+            else:
+                old_output = open(output_file, 'rb') if previous else None
+                try:
+                    for file_path, data, _ in sections:
+                        entry = _write_incremental_segment(writer, file_path, previous.get(file_path), old_output, data)
+                        reused += entry.pop("reused")
+                        entries.append(entry)
+                finally:
+                    if old_output:
+                        old_output.close()
+            output_size = writer.offset
+
+        if incremental:
+            if previous:
+                os.replace(target_file, output_file)
+            save_manifest(output_file, entries, output_size)
+            print(f"Incremental pyCat: reused {reused} unchanged file(s), rewrote {len(entries) - reused}.")
+        _report_dedup(dedup)
+        if strip and output_file != "-":
+            _save_line_maps(output_file, line_maps)
+        print(f"Successfully pyCatenated to {'stdout' if output_file == '-' else output_file}.")
         return True
     except Exception as e:
         print(f"Error writing files: {e}")
+        if target_file != output_file and os.path.exists(target_file):
+            os.remove(target_file)
         return False
 
 
-def append_python_files(directory, output_file, include_files=None, skip_files=None, skip_dirs=None):
+def _save_line_maps(output_file, line_maps):
+    """Writes the stripped-output line maps, keyed by source path, next to the output."""
+    with open(linemap_path_for(output_file), 'w', encoding='utf-8') as file:
+        json.dump({"format": "[output_line, source_line, count] runs, output lines counted from the line after each '# Section' header",
+                   "files": line_maps}, file)
+
+
+def _report_dedup(dedup):
+    if dedup is not None:
+        print(f"Deduplicated {dedup.duplicates} file(s), saved {dedup.saved_bytes} bytes.")
+
+
+def _write_incremental_segment(writer, file_path, entry, old_output, data=None):
+    """Writes one file's segment, reusing the previous output when the file is unchanged."""
+    stat = os.stat(file_path)
+    offset = writer.offset
+
+    if entry and entry["size"] == stat.st_size:
+        unchanged = entry["mtime_ns"] == stat.st_mtime_ns
+        if not unchanged:
+            # Touched but maybe not modified: fall back to the content hash
+            unchanged = hash_file(file_path, writer.chunk_size) == entry["hash"]
+        if unchanged:
+            writer.copy_range(old_output, entry["offset"], entry["length"])
+            return dict(entry, mtime_ns=stat.st_mtime_ns, offset=offset, reused=True)
+
+    writer.write(f"# Section {file_path}\n".encode("utf-8"))
+    if data is None:
+        digest = hashlib.blake2b(digest_size=16)
+        writer.copy_file(file_path, digest=digest)
+        digest = digest.hexdigest()
+    else:
+        # Truncated file: the manifest still describes the file on disk
+        writer.write(data)
+        digest = hash_file(file_path, writer.chunk_size)
+    writer.write(b"\n\n")
+    return {
+        "path": file_path,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": digest,
+        "offset": offset,
+        "length": writer.offset - offset,
+        "reused": False,
+    }
+
+
+def append_python_files(directory, output_file, include_files=None, skip_files=None, skip_dirs=None,
+                        entry_points=None, jobs=None, import_cache=None, **write_options):
     """
     Modular function to collect and write specified Python files to a text file.
 
@@ -91,52 +1263,111 @@ def append_python_files(directory, output_file, include_files=None, skip_files=N
         include_files (list of str): List of specific Python files to include (optional).
         skip_files (list of str): List of specific Python files to skip (optional).
         skip_dirs (list of str): List of directories to skip (optional).
+        entry_points (list of str): Only write files reachable through imports from these modules (optional).
+        jobs (int): Worker processes used to parse imports in entry point mode and to strip files (optional).
+        import_cache (str): Import cache file used in entry point mode (optional).
+        **write_options: Extra keyword arguments passed on to ``write_files_to_text``.
 
     Returns:
         bool: True if processing is successful, False otherwise.
     """
-    python_files = collect_python_files(directory, include_files, skip_files, skip_dirs)
+    if entry_points:
+        # Candidates are the whole tree; the import graph decides what is included
+        python_files = collect_python_files(directory, None, skip_files, skip_dirs)
+        python_files = select_reachable_files(python_files, directory, entry_points, jobs, import_cache)
+    else:
+        python_files = collect_python_files(directory, include_files, skip_files, skip_dirs)
     if not python_files:
         print("No Python files found to process.")
         return False
 
-    return write_files_to_text(python_files, output_file)
+    return write_files_to_text(python_files, output_file, jobs=jobs, **write_options)
 
 
 def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(description="pyCat CLI for managing Python file concatenation.")
     parser.add_argument("-d", "--dir", default="./", help="Root directory to search for Python files (default: './').")
-    parser.add_argument("-o", "--output", default="pyCat-all.txt", help="Output file to save concatenated content (default: 'pyCat-all.txt').")
+    parser.add_argument("-o", "--output", default="pyCat-all.txt",
+                        help="Output file to save concatenated content, or '-' for stdout (default: 'pyCat-all.txt').")
     parser.add_argument("-i", "--include", nargs="*", help="List of specific Python files to pycat (optional).")
     parser.add_argument("-sf", "--skip-files", nargs="*", help="List of specific Python files to skip (optional).")
     parser.add_argument("-sd", "--skip-dirs", nargs="*", help="List of directories to skip (optional).")
+    parser.add_argument("--no-clipboard", action="store_true", help="Do not copy the output to the clipboard.")
+    parser.add_argument("--clipboard-limit", type=int, default=DEFAULT_CLIPBOARD_LIMIT,
+                        help=f"Skip the clipboard copy when the output is larger than this many bytes (default: {DEFAULT_CLIPBOARD_LIMIT}).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Bytes copied per read while streaming files (default: {DEFAULT_CHUNK_SIZE}).")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep a manifest next to the output and only re-read files that changed since the last run.")
+    parser.add_argument("-e", "--entry", nargs="+",
+                        help="Entry modules (dotted names or file paths); only files reachable through their imports are pycatted.")
+    parser.add_argument("-j", "--jobs", type=int,
+                        help="Worker processes used to parse imports with --entry and to --strip files (default: CPU count).")
+    parser.add_argument("--import-cache", help=f"Import cache file for --entry (default: '{IMPORT_CACHE_NAME}' in --dir).")
+    shard_group = parser.add_mutually_exclusive_group()
+    shard_group.add_argument("--shard-bytes", type=int, help="Split the output into numbered shards of at most this many bytes.")
+    shard_group.add_argument("--shard-tokens", type=int,
+                             help=f"Split the output into shards of roughly this many tokens (~{BYTES_PER_TOKEN} bytes per token).")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Write files with identical content once; later copies become a back-reference line.")
+    parser.add_argument("-z", "--compress", choices=sorted(COMPRESSION_EXTENSIONS),
+                        help="Stream the output through a compressor (zstd needs the 'zstandard' package).")
+    parser.add_argument("--strip", action="store_true",
+                        help="Drop comments, docstrings and blank-line runs; a line map back to the sources is written next to the output.")
+    parser.add_argument("--max-file-size", type=int, default=DEFAULT_MAX_FILE_BYTES,
+                        help=f"Largest file written in full, in bytes; 0 for no limit (default: {DEFAULT_MAX_FILE_BYTES}).")
+    parser.add_argument("--oversize", choices=["skip", "truncate"], default="skip",
+                        help="What to do with files over --max-file-size (default: skip).")
+    parser.add_argument("--bad-encoding", choices=["skip", "keep"], default="skip",
+                        help="What to do with files that do not decode as their declared encoding (default: skip).")
     args = parser.parse_args()
 
+    if args.compress and args.compress not in available_compressors():
+        parser.error(f"--compress {args.compress} is not available; install 'zstandard' or pick one of {available_compressors()}.")
+    if args.output == "-" and (args.incremental or args.shard_bytes or args.shard_tokens):
+        parser.error("-o - cannot be combined with --incremental or sharded output.")
+    if args.shard_tokens:
+        args.shard_bytes = args.shard_tokens * BYTES_PER_TOKEN
+    if args.incremental and (args.shard_bytes or args.dedup or args.compress or args.strip):
+        parser.error("--incremental cannot be combined with sharded, deduplicated, compressed or stripped output.")
+
     directory = args.dir
     output_file = args.output
     include_files = args.include
     skip_files = args.skip_files
     skip_dirs = args.skip_dirs
 
-    # Display the working directory
-    absolute_directory = os.path.abspath(directory)
-    print(f"Starting pyCat in: {absolute_directory}")
+    # With '-o -' stdout carries the output, so progress messages go to stderr
+    with contextlib.redirect_stdout(sys.stderr) if output_file == "-" else contextlib.nullcontext():
+        # Display the working directory
+        absolute_directory = os.path.abspath(directory)
+        print(f"Starting pyCat in: {absolute_directory}")
 
-    # Concatenate Python files
-    success = append_python_files(directory, output_file, include_files, skip_files, skip_dirs)
+        # The clipboard is fed from the same streaming pass as the output file
+        clipboard = None if args.no_clipboard or output_file == "-" else ClipboardSink(args.clipboard_limit)
+        sinks = [clipboard] if clipboard else None
 
-    # If successful, copy to clipboard
-    if success:
-        try:
-            with open(output_file, 'r') as output:
-                content = output.read()
-                pyperclip.copy(content)  # Copy content to clipboard
-                print(f"Copy {output_file} to clipboard: Success.")
-        except Exception as e:
-            print(f"Error reading file for clipboard copy: {e}")
-    else:
-        print("Failed to process files.")
+        # Concatenate Python files
+        success = append_python_files(directory, output_file, include_files, skip_files, skip_dirs,
+                                      entry_points=args.entry, jobs=args.jobs, import_cache=args.import_cache,
+                                      sinks=sinks, chunk_size=args.chunk_size, incremental=args.incremental,
+                                      shard_bytes=args.shard_bytes, dedup=args.dedup, compress=args.compress,
+                                      strip=args.strip, max_file_bytes=args.max_file_size,
+                                      oversize=args.oversize, bad_encoding=args.bad_encoding)
+
+        # If successful, copy to clipboard
+        if success:
+            if clipboard:
+                try:
+                    if clipboard.copy():
+                        print(f"Copy {output_file} to clipboard: Success.")
+                    else:
+                        print(f"Output is larger than {args.clipboard_limit} bytes; skipping clipboard copy.")
+                except Exception as e:
+                    print(f"Error copying output to clipboard: {e}")
+        else:
+            print("Failed to process files.")
 
 
 if __name__ == "__main__":
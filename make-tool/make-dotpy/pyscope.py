@@ -1,53 +1,184 @@
 import argparse
 import ast
 import json
+import re
+
+MAX_SEGMENT_BYTES = 1000  # Longer import/statement text is cut off at export, e.g. huge literal assignments
+LINE_BREAK = re.compile(rb"\r\n|\r|\n")
 
 
 def analyze_code_structure(code):
     """
     Analyze the structure of the Python code using AST.
     Returns a list of functions, classes, imports, and their dependencies.
+    Imports and miscellaneous statements are recorded as spans; ``materialize_segments`` adds their text.
     """
-    tree = ast.parse(code)
-    structure = {"functions": [], "classes": [], "imports": [], "miscellaneous": []}
-
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            structure["functions"].append({
-                "name": node.name,
-                "start_line": node.lineno,
-                "end_line": node.end_lineno if hasattr(node, 'end_lineno') else None,
-                "dependencies": extract_dependencies(node)
-            })
-        elif isinstance(node, ast.ClassDef):
-            structure["classes"].append({
-                "name": node.name,
-                "start_line": node.lineno,
-                "end_line": node.end_lineno if hasattr(node, 'end_lineno') else None,
-                "methods": [n.name for n in node.body if isinstance(n, ast.FunctionDef)]
-            })
-        elif isinstance(node, (ast.Import, ast.ImportFrom)):
-            structure["imports"].append({
-                "type": "import",
-                "name": ast.unparse(node).strip(),
-                "start_line": node.lineno
-            })
-        elif isinstance(node, ast.Expr) or isinstance(node, ast.Assign):
-            structure["miscellaneous"].append({
-                "type": "miscellaneous",
-                "code": ast.unparse(node).strip(),
-                "start_line": node.lineno
-            })
+    visitor = StructureVisitor()
+    visitor.visit(ast.parse(code))
+    return visitor.structure
 
-    return structure
 
+def call_name(func):
+    """
+    Returns the dotted name a call goes to: 'name' for ``name()``, 'obj.method' for
+    ``obj.method()``; calls on other expressions, like ``f().method()``, keep just '.method'.
+    Returns None for calls of anything else, e.g. ``funcs[0]()``.
+    """
+    parts = []
+    while isinstance(func, ast.Attribute):
+        parts.append(func.attr)
+        func = func.value
+    if isinstance(func, ast.Name):
+        parts.append(func.id)
+    elif parts:
+        parts.append("")
+    else:
+        return None
+    return ".".join(reversed(parts))
+
+
+class StructureVisitor(ast.NodeVisitor):
+    """
+    Collects functions, classes, imports and miscellaneous statements in one pass over the tree.
 
-def extract_dependencies(node):
-    dependencies = []
-    for child in ast.walk(node):
-        if isinstance(child, ast.Call) and isinstance(child.func, ast.Name):
-            dependencies.append(child.func.id)
-    return dependencies
+    Keeps a stack of the enclosing scopes as it goes, so every call is added to the
+    dependencies of the innermost function it appears in, and nothing is walked twice.
+    """
+
+    def __init__(self):
+        self.structure = {"functions": [], "classes": [], "imports": [], "miscellaneous": []}
+        self.scopes = []  # (kind, qualified name, function record or None) of the enclosing classes and functions
+
+    def visit_FunctionDef(self, node, is_async=False):
+        kind = "method" if self.scopes and self.scopes[-1][0] == "class" else "function"
+        qualname = self.qualify(node.name)
+        record = {
+            "name": node.name,
+            "qualname": qualname,
+            "kind": kind,
+            "async": is_async,
+            "start_line": node.lineno,
+            "end_line": getattr(node, "end_lineno", None),
+            "dependencies": []
+        }
+        self.structure["functions"].append(record)
+        # Decorators, defaults and annotations are evaluated in the enclosing scope
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        self.visit(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+        self.scopes.append(("function", qualname, record))
+        for statement in node.body:
+            self.visit(statement)
+        self.scopes.pop()
+
+    def visit_AsyncFunctionDef(self, node):
+        self.visit_FunctionDef(node, is_async=True)
+
+    def visit_ClassDef(self, node):
+        qualname = self.qualify(node.name)
+        self.structure["classes"].append({
+            "name": node.name,
+            "qualname": qualname,
+            "start_line": node.lineno,
+            "end_line": getattr(node, "end_lineno", None),
+            "methods": [n.name for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        })
+        for child in node.decorator_list + node.bases + node.keywords:
+            self.visit(child)
+        # Calls in a class body still belong to the function the class is defined in, if any
+        self.scopes.append(("class", qualname, self.scopes[-1][2] if self.scopes else None))
+        for statement in node.body:
+            self.visit(statement)
+        self.scopes.pop()
+
+    def visit_Call(self, node):
+        function = self.scopes[-1][2] if self.scopes else None
+        if function is not None:
+            name = call_name(node.func)
+            if name is not None:
+                function["dependencies"].append(name)
+        self.generic_visit(node)
+
+    def visit_Import(self, node):
+        self.structure["imports"].append(dict(type="import", **span(node)))
+
+    visit_ImportFrom = visit_Import
+
+    def visit_Expr(self, node):
+        self.structure["miscellaneous"].append(dict(type="miscellaneous", **span(node)))
+        # Outside functions there is nothing to attribute calls to, so large module-level literals are not walked
+        if self.scopes and self.scopes[-1][2] is not None:
+            self.generic_visit(node)
+
+    visit_Assign = visit_Expr
+
+    def qualify(self, name):
+        """Returns the qualified name of a definition in the current scope, like ``__qualname__``."""
+        if not self.scopes:
+            return name
+        kind, qualname, _ = self.scopes[-1]
+        return f"{qualname}.<locals>.{name}" if kind == "function" else f"{qualname}.{name}"
+
+
+def span(node):
+    """Returns the position of a node in the source: lines, and columns as UTF-8 byte offsets like ``ast``'s."""
+    return {
+        "start_line": node.lineno,
+        "end_line": node.end_lineno,
+        "start_col": node.col_offset,
+        "end_col": node.end_col_offset
+    }
+
+
+class SourceSegments:
+    """
+    Slices the source text of recorded spans out of the original code.
+
+    The code is encoded and its line starts are found once, on the first lookup,
+    so analysis itself never copies statement text.
+    """
+
+    def __init__(self, code):
+        self.code = code
+        self.data = None
+        self.line_starts = None
+
+    def text(self, record, max_bytes=None):
+        """
+        Returns the source text of a span.
+
+        :param record: A dict with start_line, end_line, start_col and end_col, e.g. from ``span``.
+        :param max_bytes: Cut the text off after this many UTF-8 bytes (None for no limit).
+        :return: (text, whether it was cut off).
+        """
+        if self.data is None:
+            self.data = self.code.encode("utf-8")
+            self.line_starts = [0] + [match.end() for match in LINE_BREAK.finditer(self.data)]
+        start = self.line_starts[record["start_line"] - 1] + record["start_col"]
+        end = self.line_starts[record["end_line"] - 1] + record["end_col"]
+        truncated = max_bytes is not None and end - start > max_bytes
+        if truncated:
+            end = start + max_bytes
+        # A cut can split a multi-byte character; drop its partial bytes
+        return self.data[start:end].decode("utf-8", errors="ignore" if truncated else "strict"), truncated
+
+
+def materialize_segments(structure, code, max_bytes=MAX_SEGMENT_BYTES):
+    """
+    Fills in the text of recorded imports ("name") and miscellaneous statements ("code") from their spans.
+
+    Text longer than ``max_bytes`` is cut off, ends with '...' and is marked with "truncated": True.
+    """
+    segments = SourceSegments(code)
+    for key, field in (("imports", "name"), ("miscellaneous", "code")):
+        for record in structure[key]:
+            text, truncated = segments.text(record, max_bytes)
+            record[field] = text + "..." if truncated else text
+            if truncated:
+                record["truncated"] = True
+    return structure
 
 
 def assign_script_positions(structure, script_length):
@@ -68,12 +199,12 @@ def assign_script_positions(structure, script_length):
     return positions
 
 
-def preprocess_code(file_path, output_file):
+def preprocess_code(file_path, output_file, max_bytes=MAX_SEGMENT_BYTES):
     with open(file_path, "r", encoding="utf-8") as file:
         code = file.read()
 
     script_length = len(code.splitlines())
-    structure = analyze_code_structure(code)
+    structure = materialize_segments(analyze_code_structure(code), code, max_bytes)
     preprocessed_data = assign_script_positions(structure, script_length)
 
     with open(output_file, "w", encoding="utf-8") as file:
@@ -87,12 +218,16 @@ def main():
     parser = argparse.ArgumentParser(description="Preprocess Python code and output structure.")
     parser.add_argument("--file", help="Path to the Python file to preprocess.")
     parser.add_argument("--output", help="Path to save the preprocessed JSON.")
+    parser.add_argument(
+        "--max-code-bytes", type=int, default=MAX_SEGMENT_BYTES,
+        help=f"Cut off the saved text of statements longer than this many bytes (default: {MAX_SEGMENT_BYTES})."
+    )
     args = parser.parse_args()
 
     file_path = args.file or input("Enter the path to the Python file to preprocess: ").strip()
     output_file = args.output or input("Enter the path to save the preprocessed JSON file: ").strip()
 
-    preprocess_code(file_path, output_file)
+    preprocess_code(file_path, output_file, args.max_code_bytes)
 
 
 if __name__ == "__main__":